@@ -1,31 +1,111 @@
+import asyncio
 import hashlib
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer  # Add this import
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
+from time import time
 from typing import Optional
 from models import Member
 from database import get_db  # Import get_db
+from cache import TTLCache
+from metrics import BCRYPT_DURATION, PASSWORD_POOL_REJECTIONS
 
 # Security settings
-from config import SECRET_KEY, ALGORITHM
+from config import (
+    SECRET_KEY, ALGORITHM, PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL,
+    PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE
+)
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Decoded token payloads keyed by raw token, and member snapshots keyed by username
+token_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+member_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")  # Define this here
+# For routes anyone may call but that unlock more for a signed-in member
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
-    return pwd_context.hash(password)
+    started = perf_counter()
+    hashed = pwd_context.hash(password)
+    BCRYPT_DURATION.observe(perf_counter() - started, "hash")
+    return hashed
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hashed version"""
-    return pwd_context.verify(plain_password, hashed_password)
+    started = perf_counter()
+    verified = pwd_context.verify(plain_password, hashed_password)
+    BCRYPT_DURATION.observe(perf_counter() - started, "verify")
+    return verified
+
+class PasswordPool:
+    """Bounded executor for bcrypt work, kept apart from the default threadpool"""
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        self._queue_times = deque(maxlen=1000)
+
+    async def run(self, fn, *args):
+        with self._lock:
+            # Fail fast instead of letting a login burst queue up behind bcrypt
+            if self._outstanding >= self.workers + self.max_queue:
+                self.rejected += 1
+                PASSWORD_POOL_REJECTIONS.inc()
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication service busy, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self._outstanding += 1
+        submitted = perf_counter()
+
+        def timed():
+            self._queue_times.append(perf_counter() - submitted)
+            return fn(*args)
+
+        try:
+            return await asyncio.wrap_future(self._executor.submit(timed))
+        finally:
+            with self._lock:
+                self._outstanding -= 1
+
+    def stats(self):
+        samples = sorted(self._queue_times)
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "outstanding": self._outstanding,
+            "rejected": self.rejected,
+            "queue_time_p50": samples[len(samples) // 2] if samples else None,
+            "queue_time_max": samples[-1] if samples else None,
+        }
+
+password_pool = PasswordPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the bcrypt pool without blocking the event loop"""
+    return await password_pool.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt pool without blocking the event loop"""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
@@ -46,12 +126,43 @@ def verify_token(token: str):
     except JWTError:
         return None
 
+class MemberRecord:
+    """Detached snapshot of the Member fields routes read from the current user"""
+    __slots__ = ("id", "username", "full_name", "is_admin", "is_verified", "has_voted", "created_at")
+
+    def __init__(self, member: Member):
+        for field in self.__slots__:
+            setattr(self, field, getattr(member, field))
+
+def invalidate_member(username: str):
+    """Drop a cached member after its is_verified, has_voted or is_admin changes
+
+    Only this process's cache is cleared; other workers see the change once
+    their entry expires (PRINCIPAL_CACHE_TTL).
+    """
+    member_cache.invalidate(username)
+
+def cache_stats():
+    return {"tokens": token_cache.stats(), "members": member_cache.stats()}
+
+def _decode_cached(token: str):
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = verify_token(token)
+        if payload:
+            token_cache.set(token, payload)
+    # A cached payload can outlive the token itself
+    if payload and payload.get("exp", float("inf")) <= time():
+        token_cache.invalidate(token)
+        return None
+    return payload
+
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
-) -> Member:
-    """Get current user from token with database session"""
-    payload = verify_token(token)
+) -> MemberRecord:
+    """Get current user from token, using the principal cache before the database"""
+    payload = _decode_cached(token)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,16 +178,27 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(Member).filter(Member.username == username).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    user = member_cache.get(username)
+    if user is None:
+        member = db.query(Member).filter(Member.username == username).first()
+        if not member:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        user = MemberRecord(member)
+        member_cache.set(username, user)
     
     return user
 
-def is_admin(user: Member) -> bool:
+def get_optional_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Optional[MemberRecord]:
+    """The current user if a token was sent, else None"""
+    return get_current_user(token, db) if token else None
+
+def is_admin(user: MemberRecord) -> bool:
     """Check if user is admin"""
     return user.is_admin if user else False
 
@@ -0,0 +1,177 @@
+"""End-to-end benchmarks for the voting API, run in-process against the ASGI app
+
+    python -m benchmarks.api --output api.json [--baseline old.json] [--members 200]
+
+Every run uses a fresh temporary SQLite database and chain directory.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+from time import perf_counter
+
+# Configure an isolated environment before the app is imported
+_workdir = tempfile.mkdtemp(prefix="bench-api-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'members.db')}"
+os.environ["CHAIN_DATA_DIR"] = os.path.join(_workdir, "chain")
+# Sealing is driven explicitly by the scenarios below
+os.environ.setdefault("SEAL_BATCH_SIZE", str(10 ** 9))
+os.environ.setdefault("SEAL_MAX_AGE_SECONDS", str(10 ** 9))
+os.environ.setdefault("MAX_PENDING_VOTES", str(10 ** 9))
+
+import httpx  # noqa: E402
+
+import main as api  # noqa: E402
+from benchmarks.report import summarize, write_results, compare, print_results  # noqa: E402
+
+ADMIN = ("admin", "admin123")
+PASSWORD = "benchmark-password"
+
+
+async def run_concurrently(make_request, count, concurrency):
+    """Issue `count` requests with at most `concurrency` in flight; returns (latencies, statuses, elapsed)"""
+    limit = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+
+    async def one(i):
+        async with limit:
+            start = perf_counter()
+            response = await make_request(i)
+            latencies.append(perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return latencies, statuses, perf_counter() - start
+
+
+def record(results, name, latencies, statuses, elapsed):
+    results[name] = summarize(latencies, elapsed=elapsed, statuses={str(k): v for k, v in statuses.items()})
+
+
+async def token_for(client, username, password):
+    response = await client.post("/token", data={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def scenario_registration(client, results, members, concurrency):
+    async def register(i):
+        return await client.post("/register", json={
+            "full_name": f"Bench Member {i}", "username": f"bench{i}",
+            "password": PASSWORD, "confirm_password": PASSWORD
+        })
+
+    record(results, "registration_burst", *await run_concurrently(register, members, concurrency))
+
+
+async def scenario_login(client, results, members, concurrency, admin_headers):
+    ids, cursor = [], None
+    while True:
+        params = {"limit": 1000, "is_verified": False}
+        if cursor is not None:
+            params["cursor"] = cursor
+        page = (await client.get("/admin/members", params=params, headers=admin_headers)).json()
+        ids.extend(m["id"] for m in page["members"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    await client.patch("/admin/members/verify", json={"member_ids": ids, "is_verified": True}, headers=admin_headers)
+
+    async def login(i):
+        return await client.post("/token", data={"username": f"bench{i}", "password": PASSWORD})
+
+    latencies, statuses, elapsed = await run_concurrently(login, members, concurrency)
+    record(results, "login_storm", latencies, statuses, elapsed)
+
+
+async def scenario_voting(client, results, members, concurrency, candidates=5):
+    tokens = [await token_for(client, f"bench{i}", PASSWORD) for i in range(members)]
+
+    async def vote(i):
+        return await client.post("/vote", json={"candidate": f"candidate{i % candidates}"},
+                                 headers={"Authorization": f"Bearer {tokens[i]}"})
+
+    record(results, "vote_ingestion", *await run_concurrently(vote, members, concurrency))
+
+
+async def scenario_mining_under_load(client, results, concurrency, admin_headers, polls=200):
+    """Seal the pending pool while /results and /chain are being polled"""
+    async def poll(i):
+        return await client.get("/results" if i % 2 else "/chain", params={} if i % 2 else {"headers_only": True})
+
+    start = perf_counter()
+    mining = asyncio.create_task(client.post("/mine", params={"wait": True}, headers=admin_headers))
+    latencies, statuses, elapsed = await run_concurrently(poll, polls, concurrency)
+    response = await mining
+    record(results, "polling_during_mining", latencies, statuses, elapsed)
+    record(results, "mine_under_load", [perf_counter() - start], {response.status_code: 1}, None)
+
+
+def grow_chain(blocks, votes_per_block):
+    chain = api.blockchain
+    for b in range(blocks):
+        for v in range(votes_per_block):
+            chain.add_vote(f"grow-{len(chain.chain)}-{v}", f"grow{v}", f"candidate{v % 5}")
+        chain.mine_pending_votes()
+
+
+async def scenario_polling(client, results, chain_sizes, votes_per_block, polls, concurrency):
+    grown = len(api.blockchain.chain)
+    for size in chain_sizes:
+        if size > grown:
+            grow_chain(size - grown, votes_per_block)
+            grown = size
+        for name, path, params in (
+            ("results", "/results", {}),
+            ("chain_full", "/chain", {}),
+            ("chain_page", "/chain", {"start": max(1, size - 99), "limit": 100}),
+            ("chain_headers", "/chain", {"headers_only": True}),
+        ):
+            async def poll(i, path=path, params=params):
+                return await client.get(path, params=params)
+
+            record(results, f"poll_{name}[blocks={size}]", *await run_concurrently(poll, polls, concurrency))
+
+
+async def run(args):
+    results = {}
+    transport = httpx.ASGITransport(app=api.app)
+    async with api.app.router.lifespan_context(api.app):
+        # The chain only exists once the lifespan has bootstrapped the node
+        api.blockchain.difficulty = args.difficulty
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            admin_headers = {"Authorization": f"Bearer {await token_for(client, *ADMIN)}"}
+            await scenario_registration(client, results, args.members, args.concurrency)
+            await scenario_login(client, results, args.members, args.concurrency, admin_headers)
+            await scenario_voting(client, results, args.members, args.concurrency)
+            await scenario_mining_under_load(client, results, args.concurrency, admin_headers)
+            await scenario_polling(
+                client, results, [int(n) for n in args.chain_sizes.split(",")],
+                args.votes_per_block, args.polls, args.concurrency
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", default="bench_api.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--members", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--difficulty", type=int, default=3)
+    parser.add_argument("--chain-sizes", default="10,100,500")
+    parser.add_argument("--votes-per-block", type=int, default=50)
+    parser.add_argument("--polls", type=int, default=200)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    write_results(args.output, "api", results)
+    print_results(results)
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Micro benchmarks for the blockchain hot paths
+
+    python -m benchmarks.micro --output micro.json [--baseline old.json]
+"""
+import argparse
+import gc
+import os
+import tracemalloc
+from time import perf_counter, time
+
+from blockchain import Blockchain
+from miner import find_nonce
+from votes import CandidateRegistry, VoteColumns
+from benchmarks.report import summarize, write_results, compare, print_results
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = perf_counter()
+        fn()
+        samples.append(perf_counter() - start)
+    return samples
+
+
+def build_chain(blocks, votes_per_block, difficulty=1):
+    chain = Blockchain()
+    chain.difficulty = difficulty
+    for b in range(blocks):
+        for v in range(votes_per_block):
+            chain.add_vote(f"{b}-{v}", f"user{b}-{v}", f"candidate{v % 5}")
+        chain.mine_pending_votes()
+    return chain
+
+
+def bench_proof_of_work(results, difficulties, repeat, workers):
+    chain = Blockchain()
+    for difficulty in difficulties:
+        for count in sorted({1, workers}):
+
+            def mine():
+                # A fresh timestamp gives every repetition a different search
+                block = {'index': 2, 'timestamp': perf_counter(), 'merkle_root': '',
+                         'vote_count': 0, 'consensus': 'pow', 'previous_hash': '0'}
+                # Force the requested worker count even below the production parallel threshold
+                find_nonce(chain.block_string(block), difficulty, workers=count, parallel_min_difficulty=0)
+
+            results[f"proof_of_work[d={difficulty},workers={count}]"] = summarize(timed(mine, repeat))
+
+
+def bench_tally(results, chain_sizes, votes_per_block, repeat):
+    for blocks in chain_sizes:
+        chain = build_chain(blocks, votes_per_block)
+        label = f"blocks={blocks},votes={chain.total_votes}"
+        results[f"count_votes[{label}]"] = summarize(timed(chain.count_votes, repeat))
+        results[f"recount_votes[{label}]"] = summarize(timed(chain.recount_votes, max(1, repeat // 10)))
+
+
+def bench_hash_block(results, block_sizes, repeat):
+    chain = build_chain(0, 0)
+    for size in block_sizes:
+        for v in range(size):
+            chain.add_vote(f"{size}-{v}", f"user{v}", f"candidate{v % 5}")
+        block = chain.mine_pending_votes()
+        results[f"hash_block[votes={size}]"] = summarize(timed(lambda: chain.hash_block(block), repeat))
+
+
+def _make_vote(i, candidates=5):
+    # Built per vote, as request parsing would, so no strings are shared by accident
+    return {'member_id': str(i), 'username': f"user{i}", 'candidate': f"Candidate {i % candidates}", 'timestamp': time()}
+
+
+def _retained_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del value
+    return used
+
+
+def bench_vote_memory(results, count):
+    """Bytes retained per stored vote: a list of dicts versus interned columns"""
+    dict_bytes = _retained_bytes(lambda: [_make_vote(i) for i in range(count)])
+    column_bytes = _retained_bytes(
+        lambda: VoteColumns.from_dicts((_make_vote(i) for i in range(count)), CandidateRegistry())
+    )
+    results[f"vote_memory[votes={count}]"] = {
+        "count": count,
+        "dict_bytes_per_vote": dict_bytes / count,
+        "columnar_bytes_per_vote": column_bytes / count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", default="bench_micro.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--difficulties", default="2,3,4,5")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chain-sizes", default="10,100,1000")
+    parser.add_argument("--votes-per-block", type=int, default=50)
+    parser.add_argument("--block-sizes", default="10,100,1000")
+    parser.add_argument("--memory-votes", type=int, default=100000)
+    args = parser.parse_args()
+
+    results = {}
+    bench_proof_of_work(results, [int(d) for d in args.difficulties.split(",")], max(1, args.repeat // 4), args.workers)
+    bench_tally(results, [int(n) for n in args.chain_sizes.split(",")], args.votes_per_block, args.repeat)
+    bench_hash_block(results, [int(n) for n in args.block_sizes.split(",")], args.repeat)
+    bench_vote_memory(results, args.memory_votes)
+
+    write_results(args.output, "micro", results)
+    print_results(results)
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import json
+import os
+import platform
+import statistics
+import sys
+from time import time
+
+# ---------------------------
+# Benchmark result helpers
+# ---------------------------
+
+REPORTED_KEYS = ("p50", "p95", "throughput", "dict_bytes_per_vote", "columnar_bytes_per_vote")
+
+
+def summarize(samples, count=None, elapsed=None, **extra):
+    """Latency summary in seconds for a list of per-operation timings"""
+    ordered = sorted(samples)
+    result = {
+        "count": count if count is not None else len(ordered),
+        "mean": statistics.fmean(ordered) if ordered else None,
+        "p50": ordered[len(ordered) // 2] if ordered else None,
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else None,
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] if ordered else None,
+        "max": ordered[-1] if ordered else None,
+    }
+    if elapsed:
+        result["elapsed"] = elapsed
+        result["throughput"] = result["count"] / elapsed
+    result.update(extra)
+    return result
+
+
+def write_results(path, suite, results):
+    document = {
+        "suite": suite,
+        "created_at": time(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    return document
+
+
+def compare(current, baseline_path, metric_keys=("p50", "mean", "throughput")):
+    """Print the relative change of each shared metric against a baseline run"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    for name, result in sorted(current.items()):
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:45s} (no baseline)")
+            continue
+        for key in metric_keys:
+            if result.get(key) and base.get(key):
+                change = (result[key] - base[key]) / base[key] * 100
+                print(f"{name:45s} {key:10s} {base[key]:12.6g} -> {result[key]:12.6g} ({change:+.1f}%)")
+
+
+def print_results(results):
+    for name, result in sorted(results.items()):
+        parts = [f"{key}={result[key]:.6g}" for key in REPORTED_KEYS if result.get(key) is not None]
+        print(f"{name:45s} " + " ".join(parts))
@@ -1,95 +1,413 @@
 import hashlib
 import json
+import logging
+import threading
+from concurrent.futures import Future
 from time import time
 
+from cache import TTLCache
+from config import CHAIN_SERIALIZED_CACHE_SIZE, CONSENSUS, LEGACY_CONSENSUS, MIN_DIFFICULTY, POA_KEY_FILE
+from consensus import build_consensus
+from merkle import merkle_root, merkle_path
+from votes import CandidateRegistry, VoteColumns, encode_votes
+
+# Fields covered by the block hash; votes are committed to through merkle_root.
+# Blocks stored before 'difficulty' was recorded simply omit it.
+HEADER_FIELDS = ('index', 'timestamp', 'previous_hash', 'merkle_root', 'vote_count', 'consensus', 'difficulty')
+
+# Every node derives the same genesis block; its proof-of-work nonce is precomputed per difficulty
+GENESIS_TIMESTAMP = 0.0
+GENESIS_NONCES = {("pow", 4): 3368}
+
+# Marks a vote in the member index that is still in the pending pool
+PENDING = "pending"
+
+logger = logging.getLogger(__name__)
+
+class DuplicateVote(ValueError):
+    """The member already has a pending or sealed vote in this election"""
+
 class Blockchain:
-    def __init__(self):
+    def __init__(self, store=None, consensus=CONSENSUS, legacy_consensus=LEGACY_CONSENSUS, difficulty=4):
         self.chain = []
         self.current_votes = []
-        self.difficulty = 4
-        self.create_genesis_block()
+        self.difficulty = difficulty
+        # New blocks are sealed with self.consensus; validation uses whichever sealed each block,
+        # as long as it is this consensus or one explicitly allowed for older blocks
+        self.consensus_types = build_consensus(POA_KEY_FILE)
+        for name in (consensus, *legacy_consensus):
+            if name not in self.consensus_types:
+                raise ValueError(f"Unknown consensus type: {name}")
+        self.consensus = self.consensus_types[consensus]
+        self.accepted_consensus = {consensus, *legacy_consensus}
+        # Running tally of the votes cast without an election (the original ballot),
+        # updated as blocks are appended so reads never rescan the chain
+        self.tally = {}
+        self.total_votes = 0
+        # Per-election tallies, so one election's results never touch another's votes
+        self.election_tallies = {}
+        # (election id or 0, member_id) -> (block index, position) or PENDING; one entry per vote cast
+        self.vote_index = {}
+        # Sealed votes are stored column-wise with candidate names interned here
+        self.candidates = CandidateRegistry()
+        # Height up to which verify_chain has already checked linkage and proofs
+        self.verified_height = 0
+        # Serialized bytes of sealed blocks, keyed by (index, headers_only); blocks never change once sealed
+        # Sealed blocks never change, so entries only leave by LRU eviction
+        self._serialized = TTLCache(CHAIN_SERIALIZED_CACHE_SIZE, ttl=float("inf"))
+        # Guards current_votes; the mining lock keeps blocks appended one at a time
+        self._lock = threading.Lock()
+        self._mining_lock = threading.RLock()
+        # Called with each block appended, whether sealed here or synced from the store
+        self.listeners = []
+        # Optional ChainStore; without one the chain lives only in memory
+        self.store = store
+        if store is not None and store.height():
+            self._restore()
+        else:
+            self.create_genesis_block()
+
+    def _journaling(self):
+        return self.store is not None and not self.store.readonly
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def _notify(self, block):
+        for listener in self.listeners:
+            try:
+                listener(block)
+            except Exception:
+                logger.exception("block listener failed", extra={"block_index": block['index']})
+
+    def _restore(self):
+        """Load the chain from the store, replaying the tally only after the last checkpoint
+
+        Every block's header (linkage and seal) is still checked, so
+        verified_height covers the whole restored chain.
+        """
+        self.chain = list(self.store.iter_blocks())
+        for block in self.chain:
+            block['votes'] = VoteColumns.from_dicts(block['votes'], self.candidates)
+            self._index_block(block)
+        checkpoint = self.store.load_checkpoint()
+        start = 1
+        if (checkpoint and 'election_tallies' in checkpoint
+                and self.chain[checkpoint['height'] - 1]['hash'] == checkpoint['tip_hash']):
+            self.tally = dict(checkpoint['tally'])
+            self.total_votes = checkpoint['total_votes']
+            # JSON object keys are strings; election ids are ints
+            self.election_tallies = {int(e): dict(t) for e, t in checkpoint['election_tallies'].items()}
+            start = checkpoint['height']
+        previous_hash = '0'
+        for block in self.chain:
+            if block['previous_hash'] != previous_hash or not self.is_valid_proof(block):
+                raise ValueError(f"Stored block {block['index']} failed verification")
+            if block['index'] > start:
+                self._apply_to_tally(block)
+            previous_hash = block['hash']
+        self.verified_height = len(self.chain)
+
+        if self.store.readonly:
+            return
+        # A crash between sealing and rewriting the pending log can leave sealed votes behind
+        self.current_votes = []
+        for vote in self.store.load_pending():
+            key = (vote.get('election') or 0, vote['member_id'])
+            if key not in self.vote_index:
+                self.vote_index[key] = PENDING
+                self.current_votes.append(vote)
+
+    def sync_from_store(self):
+        """Append blocks another process has written to the shared store; returns how many"""
+        if self.store.refresh() <= len(self.chain):
+            return 0
+        added = []
+        with self._mining_lock:
+            fully_verified = self.verified_height == len(self.chain)
+            for block in self.store.iter_blocks(start=len(self.chain) + 1):
+                if block['previous_hash'] != self.chain[-1]['hash'] or not self.is_valid_proof(block):
+                    raise ValueError(f"Synced block {block['index']} failed verification")
+                block['votes'] = VoteColumns.from_dicts(block['votes'], self.candidates)
+                self.chain.append(block)
+                self._index_block(block)
+                self._apply_to_tally(block)
+                added.append(block)
+            if fully_verified:
+                self.verified_height = len(self.chain)
+        for block in added:
+            self._notify(block)
+        return len(added)
+
+    def replace_pending(self, votes):
+        """Make `votes` the pending pool, e.g. when this process takes over sealing"""
+        with self._lock:
+            for vote in self.current_votes:
+                key = (vote.get('election') or 0, vote['member_id'])
+                if self.vote_index.get(key) == PENDING:
+                    del self.vote_index[key]
+            self.current_votes = list(votes)
+            for vote in self.current_votes:
+                self.vote_index[(vote.get('election') or 0, vote['member_id'])] = PENDING
+            if self._journaling():
+                self.store.reset_pending(list(self.current_votes))
     
     def create_genesis_block(self):
         genesis_block = {
             'index': 1,
-            'timestamp': time(),
+            'timestamp': GENESIS_TIMESTAMP,
             'votes': [],
+            'merkle_root': merkle_root([]),
+            'vote_count': 0,
+            'consensus': self.consensus.name,
+            'difficulty': self.difficulty,
             'previous_hash': '0',
             'nonce': 0
         }
-        genesis_block['hash'] = self.proof_of_work(genesis_block)
+        nonce = GENESIS_NONCES.get((self.consensus.name, self.difficulty))
+        if nonce is not None:
+            genesis_block['nonce'] = nonce
+            genesis_block['hash'] = self.hash_block(genesis_block)
+        else:
+            genesis_block['hash'] = self.seal(genesis_block)
+        genesis_block['votes'] = VoteColumns(self.candidates)
         self.chain.append(genesis_block)
+        if self._journaling():
+            self.store.append_block(genesis_block)
 
-    def proof_of_work(self, block):
-        block_copy = block.copy()
-        block_copy.pop('hash', None)
-        block_string = json.dumps(block_copy, sort_keys=True).encode()
-        
-        nonce = 0
-        while True:
-            hash_attempt = hashlib.sha256(block_string + str(nonce).encode()).hexdigest()
-            if hash_attempt.startswith('0' * self.difficulty):
-                return hash_attempt
-            nonce += 1
-
-    def create_block(self, previous_hash):
-        block = {
-            'index': len(self.chain) + 1,
-            'timestamp': time(),
-            'votes': self.current_votes.copy(),  # Important: use copy()
-            'previous_hash': previous_hash,
-            'nonce': 0,
-            'hash': ''
-        }
-        block['hash'] = self.proof_of_work(block)
-        self.chain.append(block)
-        self.current_votes = []  # Clear current votes after mining
+    def block_header(self, block):
+        """Fixed-size header of a block, without its votes"""
+        header = {field: block[field] for field in HEADER_FIELDS if field in block}
+        header['nonce'] = block['nonce']
+        header['hash'] = block['hash']
+        for field in ('signer', 'signature'):
+            if field in block:
+                header[field] = block[field]
+        return header
+
+    def serialize_block(self, block, headers_only=False):
+        """JSON bytes of a sealed block (or its header), cached for recently served blocks"""
+        key = (block['index'], headers_only)
+        data = self._serialized.get(key)
+        if data is None:
+            data = json.dumps(self.block_header(block) if headers_only else block, default=encode_votes).encode()
+            self._serialized.set(key, data)
+        return data
+
+    def block_string(self, block):
+        """Canonical bytes hashed for a block: the header fields, excluding hash and nonce"""
+        return json.dumps({field: block[field] for field in HEADER_FIELDS if field in block}, sort_keys=True).encode()
+
+    def seal(self, block):
+        """Seal a block with the configured consensus and return its hash"""
+        return self.consensus.seal(self, block)
+
+    def is_valid_proof(self, block):
+        """Re-verify a block's seal with the consensus recorded in it, if that one is accepted"""
+        if block.get('consensus') not in self.accepted_consensus:
+            return False
+        return self.consensus_types[block['consensus']].verify(self, block)
+
+    def difficulty_floor(self):
+        """Lowest proof-of-work difficulty a block may claim"""
+        return self.difficulty if MIN_DIFFICULTY is None else MIN_DIFFICULTY
+
+    def create_block(self, previous_hash, max_votes=None):
+        with self._mining_lock:
+            # Take the pending votes up front so votes cast while mining wait for the next block
+            with self._lock:
+                if max_votes is None:
+                    votes, self.current_votes = self.current_votes, []
+                else:
+                    votes, self.current_votes = self.current_votes[:max_votes], self.current_votes[max_votes:]
+            block = {
+                'index': len(self.chain) + 1,
+                'timestamp': time(),
+                'votes': votes,
+                'merkle_root': merkle_root(votes),
+                'vote_count': len(votes),
+                'consensus': self.consensus.name,
+                'difficulty': self.difficulty,
+                'previous_hash': previous_hash,
+                'nonce': 0,
+                'hash': ''
+            }
+            try:
+                block['hash'] = self.seal(block)
+            except BaseException:
+                with self._lock:
+                    self.current_votes = votes + self.current_votes
+                raise
+            block['votes'] = VoteColumns.from_dicts(votes, self.candidates)
+            self.chain.append(block)
+            self._index_block(block)
+            self._apply_to_tally(block)
+            if self._journaling():
+                self._persist(block)
+        self._notify(block)
         return block
 
-    def add_vote(self, member_id, username, candidate):
+    def _persist(self, block):
+        self.store.append_block(block)
+        with self._lock:
+            # Only the snapshot is taken under the lock; the journal thread does the rewrite
+            self.store.reset_pending(list(self.current_votes))
+        if self.store.should_checkpoint(block['index']):
+            self.store.write_checkpoint(
+                block['index'], block['hash'], self.tally, self.total_votes, self.election_tallies
+            )
+
+    def add_vote(self, member_id, username, candidate, timestamp=None, election=None):
         if not all(isinstance(x, str) for x in [member_id, username, candidate]):
             raise ValueError("All vote parameters must be strings")
+        if election is not None and not (isinstance(election, int) and election > 0):
+            raise ValueError("Election must be a positive integer id")
             
-        # Debug print to verify votes are being added
-        print(f"Adding vote: {member_id}, {username}, {candidate}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("vote added", extra={"member_id": member_id, "candidate": candidate})
         vote = {
             'member_id': member_id,
             'username': username,
             'candidate': candidate,
-            'timestamp': time()
+            'timestamp': time() if timestamp is None else timestamp
         }
-        self.current_votes.append(vote)
+        if election is not None:
+            vote['election'] = election
+        key = (election or 0, member_id)
+        with self._lock:
+            # O(1) check against both the pending pool and every sealed block
+            if key in self.vote_index:
+                raise DuplicateVote(f"Member {member_id} has already voted")
+            self.vote_index[key] = PENDING
+            self.current_votes.append(vote)
+            if self._journaling():
+                self.store.append_pending(vote)
         return vote
 
-    def mine_pending_votes(self):
+    def flush_pending(self):
+        """Future resolved once every vote added so far is durable in the pending journal"""
+        if not self._journaling():
+            done = Future()
+            done.set_result(None)
+            return done
+        return self.store.sync_pending()
+
+    def oldest_pending_timestamp(self):
+        with self._lock:
+            return self.current_votes[0]['timestamp'] if self.current_votes else None
+
+    def mine_pending_votes(self, max_votes=None):
         if not self.current_votes:
-            print("Warning: No votes to mine!")
+            logger.warning("no votes to mine")
             return None
-    
-        # Debug print to show votes being mined
-        print(f"Mining {len(self.current_votes)} votes")
-        
-        last_block = self.get_last_block()
-        new_block = self.create_block(last_block['hash'])
         
-        # Debug print to verify block contents
-        print(f"New block contains {len(new_block['votes'])} votes")
+        with self._mining_lock:
+            last_block = self.get_last_block()
+            new_block = self.create_block(last_block['hash'], max_votes=max_votes)
         
+        logger.info("block sealed", extra={
+            "block_index": new_block['index'],
+            "votes": len(new_block['votes']),
+            "pending": len(self.current_votes)
+        })
         return new_block
 
-    def count_votes(self):
+    def _apply_to_tally(self, block):
+        for candidate, count in block['votes'].candidate_counts().items():
+            self.tally[candidate] = self.tally.get(candidate, 0) + count
+            self.total_votes += count
+        for election, counts in block['votes'].election_counts().items():
+            tally = self.election_tallies.setdefault(election, {})
+            for candidate, count in counts.items():
+                tally[candidate] = tally.get(candidate, 0) + count
+
+    def _index_block(self, block):
+        votes = block['votes']
+        for position, key in enumerate(zip(votes.election_ids, votes.member_ids)):
+            # Keep the first sealed vote if an older chain holds a duplicate
+            if self.vote_index.get(key, PENDING) == PENDING:
+                self.vote_index[key] = (block['index'], position)
+
+    def count_votes(self, election=None):
+        """Return the running per-candidate tally of one election, or of untagged votes (O(candidates))"""
+        if election is not None:
+            return dict(self.election_tallies.get(election, {}))
+        return dict(self.tally)
+
+    def recount_votes(self, election=None):
+        """Rebuild the tally of one election, or of untagged votes, by scanning every block in the chain"""
         tally = {}
         # Count votes in all blocks except genesis (which has no votes)
         for block in self.chain[1:]:
             for vote in block['votes']:
+                if vote.get('election') != election:
+                    continue
                 candidate = vote['candidate']
                 tally[candidate] = tally.get(candidate, 0) + 1
         return tally
 
+    def verify_tally(self, election=None):
+        """Check the running tally (of one election, if given) against a full recount of the chain"""
+        recount = self.recount_votes(election)
+        if election is not None:
+            return recount == self.election_tallies.get(election, {})
+        return recount == self.tally and sum(recount.values()) == self.total_votes
+
+    def verify_chain(self, full=False, check_votes=False):
+        """Check linkage and each block's consensus seal from block headers
+
+        By default only blocks above verified_height are checked; pass full=True
+        to start again from genesis. check_votes also recomputes each Merkle root.
+        """
+        # Check a snapshot so blocks sealed or synced meanwhile are left for the next call
+        chain = self.chain[:]
+        start = 0 if full else min(self.verified_height, len(chain))
+        previous_hash = chain[start - 1]['hash'] if start else '0'
+        verified, error = start, None
+        for block in chain[start:]:
+            if block['previous_hash'] != previous_hash:
+                error = f"Block {block['index']} does not link to its predecessor"
+            elif not self.is_valid_proof(block):
+                error = f"Block {block['index']} has an invalid {block.get('consensus')} seal"
+            elif check_votes and merkle_root(block['votes']) != block['merkle_root']:
+                error = f"Block {block['index']} votes do not match its Merkle root"
+            if error:
+                break
+            verified = block['index']
+            previous_hash = block['hash']
+        with self._mining_lock:
+            # sync_from_store also advances verified_height; it only ever moves forward
+            self.verified_height = max(self.verified_height, verified)
+            verified_height = self.verified_height
+        return {"valid": error is None, "verified_height": verified_height, "error": error}
+
+    def lookup_vote(self, member_id, election=None):
+        """(block index, position) of a member's sealed vote, PENDING, or None if they have not voted"""
+        return self.vote_index.get((election or 0, member_id))
+
+    def find_vote(self, member_id, election=None):
+        """Locate a member's sealed vote as (block, position), or None"""
+        location = self.lookup_vote(member_id, election)
+        if location is None or location == PENDING:
+            return None
+        block_index, position = location
+        return self.chain[block_index - 1], position
+
+    def vote_receipt(self, member_id, election=None):
+        """A sealed vote with the Merkle path proving it is under its block header"""
+        found = self.find_vote(member_id, election)
+        if found is None:
+            return None
+        block, position = found
+        return {
+            "vote": block['votes'][position],
+            "position": position,
+            "merkle_path": merkle_path(block['votes'], position),
+            "block_header": self.block_header(block)
+        }
+
     def get_last_block(self):
         return self.chain[-1] if self.chain else None
 
     def hash_block(self, block):
-        block_copy = block.copy()
-        block_copy.pop('hash', None)
-        return hashlib.sha256(json.dumps(block_copy, sort_keys=True).encode()).hexdigest()
\ No newline at end of file
+        return hashlib.sha256(self.block_string(block) + str(block.get('nonce', 0)).encode()).hexdigest()
\ No newline at end of file
@@ -0,0 +1,113 @@
+import fcntl
+import logging
+import os
+from contextlib import contextmanager
+
+from sqlalchemy import inspect
+
+import models
+from auth import hash_password
+from models import Member, PendingVote
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# One-time startup: schema and seed data
+# ---------------------------
+#
+# Run from the application lifespan rather than at import, and safe to repeat:
+# each step checks what is already in place and only does the missing work.
+
+@contextmanager
+def exclusive(directory):
+    """Hold an exclusive lock so concurrently booting workers bootstrap one at a time"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "bootstrap.lock"), "a+") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _pending_votes_outdated(engine, inspector):
+    """True for a pending_votes table from before multi-election support or AUTOINCREMENT ids"""
+    if "pending_votes" not in inspector.get_table_names():
+        return False
+    if "election_id" not in {column["name"] for column in inspector.get_columns("pending_votes")}:
+        return True
+    # One vote per member overall, rather than per (election, member)
+    if any(c["column_names"] == ["member_id"] for c in inspector.get_unique_constraints("pending_votes")):
+        return True
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            sql = conn.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'pending_votes'"
+            ).scalar()
+        return "AUTOINCREMENT" not in sql.upper()
+    return False
+
+def _rebuild_pending_votes(engine, inspector):
+    """Recreate pending_votes with the current definition, keeping its rows and ids"""
+    if engine.dialect.name != "sqlite":
+        raise RuntimeError(
+            "pending_votes predates multi-election support: add a nullable integer election_id column, "
+            "drop the unique constraint on member_id and create the unique index "
+            "ux_pending_votes_election_member on (election_id, member_id) before starting"
+        )
+    columns = {column["name"] for column in inspector.get_columns("pending_votes")}
+    election_id = "election_id" if "election_id" in columns else "NULL"
+    with engine.begin() as conn:
+        # SQLite index names are global, so the old table's indexes must go before the new ones exist
+        for index in inspector.get_indexes("pending_votes"):
+            conn.exec_driver_sql(f'DROP INDEX "{index["name"]}"')
+        conn.exec_driver_sql("ALTER TABLE pending_votes RENAME TO pending_votes_old")
+        PendingVote.__table__.create(conn)
+        conn.exec_driver_sql(
+            "INSERT INTO pending_votes (id, member_id, election_id, username, candidate, timestamp) "
+            f"SELECT id, member_id, {election_id}, username, candidate, timestamp FROM pending_votes_old"
+        )
+        conn.exec_driver_sql("DROP TABLE pending_votes_old")
+    logger.warning("rebuilt pending_votes table for the current schema")
+
+def migrate(engine):
+    """Create missing tables and indexes; returns how many objects were created"""
+    inspector = inspect(engine)
+    if _pending_votes_outdated(engine, inspector):
+        _rebuild_pending_votes(engine, inspector)
+        inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    missing = [table for table in models.Base.metadata.sorted_tables if table.name not in existing]
+    if missing:
+        models.Base.metadata.create_all(bind=engine, tables=missing)
+    created = len(missing)
+    # create_all skips tables that already exist, so add any indexes they are missing
+    for table in models.Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        indexed = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexed:
+                index.create(bind=engine)
+                created += 1
+    if created:
+        logger.info("database schema updated", extra={"objects_created": created})
+    return created
+
+def seed_admin(session_factory):
+    """Ensure the initial admin account exists and is verified; bcrypt only runs when creating it"""
+    with session_factory() as db:
+        admin = db.query(Member).filter(Member.username == "admin").first()
+        if admin is None:
+            logger.info("creating initial admin account")
+            db.add(Member(
+                username="admin",
+                hashed_password=hash_password("admin123"),
+                full_name="System Admin",
+                is_admin=True,
+                is_verified=True
+            ))
+        elif not admin.is_verified:
+            admin.is_verified = True
+        else:
+            return
+        db.commit()
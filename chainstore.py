@@ -0,0 +1,286 @@
+import json
+import logging
+from concurrent.futures import Future
+import os
+import queue
+import struct
+import threading
+
+from votes import encode_votes
+from config import CHAIN_SEGMENT_BYTES, CHAIN_CHECKPOINT_INTERVAL, PENDING_FSYNC_INTERVAL
+
+# ---------------------------
+# Append-only on-disk chain store
+# ---------------------------
+#
+# Layout of the store directory:
+#   segment-000001.log  one JSON-encoded block per line, appended only
+#   index.bin           fixed-size (segment, offset, length) record per block height
+#   checkpoint.json     tally and tip at a known height, rewritten atomically
+#   pending.log         votes not yet sealed into a block
+
+INDEX_RECORD = struct.Struct("<IQI")
+
+logger = logging.getLogger(__name__)
+
+
+def _atomic_write(path, data: bytes):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class ChainStore:
+    """Persists sealed blocks, pending votes and tally checkpoints"""
+
+    def __init__(self, directory, segment_bytes=CHAIN_SEGMENT_BYTES,
+                 checkpoint_interval=CHAIN_CHECKPOINT_INTERVAL):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.checkpoint_interval = checkpoint_interval
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = []  # height - 1 -> (segment, offset, length)
+        self._segment = None
+        self._segment_no = 0
+        self._index_file = None
+        self._pending = None
+        self._pending_unsynced = 0
+        # Pending-log appends and rewrites, applied in order by the journal thread
+        self._journal = None
+        self._journal_thread = None
+        self.readonly = False
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _segment_path(self, number):
+        return self._path(f"segment-{number:06d}.log")
+
+    # Recovery
+
+    def _segment_numbers(self):
+        return sorted(
+            int(name[8:14]) for name in os.listdir(self.directory)
+            if name.startswith("segment-") and name.endswith(".log")
+        )
+
+    def _load_index(self):
+        path = self._path("index.bin")
+        if not os.path.exists(path):
+            return []
+        with open(path, "rb") as f:
+            data = f.read()
+        usable = len(data) - len(data) % INDEX_RECORD.size
+        return [INDEX_RECORD.unpack_from(data, pos) for pos in range(0, usable, INDEX_RECORD.size)]
+
+    def _scan_tail(self, index, repair=True):
+        """Index any blocks written after the last index record and drop torn writes
+
+        Readers pass repair=False: an incomplete tail may be a write still in progress.
+        """
+        segments = self._segment_numbers()
+        if not segments:
+            return index
+        if index:
+            segment, offset, length = index[-1]
+            start_segment, start_offset = segment, offset + length
+        else:
+            start_segment, start_offset = segments[0], 0
+        for number in segments:
+            if number < start_segment:
+                continue
+            offset = start_offset if number == start_segment else 0
+            path = self._segment_path(number)
+            with open(path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        json.loads(line)
+                    except ValueError:
+                        break
+                    index.append((number, offset, len(line)))
+                    offset += len(line)
+            if repair and offset < os.path.getsize(path):
+                # A crash mid-append left a partial record behind
+                with open(path, "r+b") as f:
+                    f.truncate(offset)
+        return index
+
+    def open(self, readonly=False):
+        """Recover the index and open the active segment for appending
+
+        A readonly store only follows blocks appended by the single writer.
+        """
+        self.readonly = readonly
+        if readonly:
+            self.refresh()
+            return self
+        with self._lock:
+            self._index = self._scan_tail(self._load_index())
+            _atomic_write(self._path("index.bin"), b"".join(INDEX_RECORD.pack(*r) for r in self._index))
+            segments = self._segment_numbers()
+            self._segment_no = segments[-1] if segments else 1
+            self._segment = open(self._segment_path(self._segment_no), "ab")
+            self._index_file = open(self._path("index.bin"), "ab")
+            self._pending = open(self._path("pending.log"), "ab")
+        self._journal = queue.Queue()
+        self._journal_thread = threading.Thread(target=self._write_journal, name="pending-journal", daemon=True)
+        self._journal_thread.start()
+        return self
+
+    def close(self):
+        if self._journal_thread is not None:
+            # Let queued pending-log writes land before the file is closed
+            self._journal.put(None)
+            self._journal_thread.join()
+            self._journal_thread = None
+        with self._lock:
+            for f in (self._segment, self._index_file, self._pending):
+                if f is not None:
+                    f.flush()
+                    os.fsync(f.fileno())
+                    f.close()
+            self._segment = self._index_file = self._pending = None
+
+    def refresh(self):
+        """Index blocks another process has appended since the last look"""
+        with self._lock:
+            self._index = self._scan_tail(self._index or self._load_index(), repair=False)
+        return len(self._index)
+
+    def height(self):
+        return len(self._index)
+
+    def read_block(self, height):
+        segment, offset, length = self._index[height - 1]
+        with open(self._segment_path(segment), "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def iter_blocks(self, start=1):
+        """Yield stored blocks from `start` (1-based height) to the tip"""
+        current, f = None, None
+        try:
+            for segment, offset, length in self._index[start - 1:]:
+                if segment != current:
+                    if f is not None:
+                        f.close()
+                    f = open(self._segment_path(segment), "rb")
+                    current = segment
+                f.seek(offset)
+                yield json.loads(f.read(length))
+        finally:
+            if f is not None:
+                f.close()
+
+    def load_checkpoint(self):
+        path = self._path("checkpoint.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            checkpoint = json.load(f)
+        # A checkpoint past the recovered tip cannot be trusted
+        return checkpoint if checkpoint["height"] <= self.height() else None
+
+    def load_pending(self):
+        votes = []
+        with open(self._path("pending.log"), "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                votes.append(json.loads(line))
+        return votes
+
+    # Appends
+
+    def append_block(self, block):
+        """Append one sealed block; costs a single fsync of the segment"""
+        record = json.dumps(block, sort_keys=True, default=encode_votes).encode() + b"\n"
+        with self._lock:
+            if self._segment.tell() and self._segment.tell() + len(record) > self.segment_bytes:
+                self._segment.close()
+                self._segment_no += 1
+                self._segment = open(self._segment_path(self._segment_no), "ab")
+            offset = self._segment.tell()
+            self._segment.write(record)
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+            entry = (self._segment_no, offset, len(record))
+            self._index.append(entry)
+            # The index is rebuilt from the segments on recovery, so no fsync here
+            self._index_file.write(INDEX_RECORD.pack(*entry))
+            self._index_file.flush()
+
+    # The pending log is written by a dedicated thread, so neither the event loop
+    # (adding votes) nor the miner (sealing them) ever waits on its I/O. Callers
+    # enqueue under the pool lock, which keeps the log's order the pool's order.
+
+    def append_pending(self, vote):
+        self._journal.put(("append", vote))
+
+    def reset_pending(self, votes):
+        """Replace the pending log with `votes`, a snapshot of those still waiting for a block"""
+        self._journal.put(("reset", votes))
+
+    def sync_pending(self):
+        """Future resolved once everything queued so far is written and fsynced"""
+        future = Future()
+        self._journal.put(("sync", future))
+        return future
+
+    def _write_journal(self):
+        while True:
+            batch = [self._journal.get()]
+            while True:
+                try:
+                    batch.append(self._journal.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in batch
+            waiters = [item[1] for item in batch if item is not None and item[0] == "sync"]
+            try:
+                for item in batch:
+                    if item is None:
+                        break
+                    kind, payload = item
+                    if kind == "sync":
+                        continue
+                    if kind == "append":
+                        self._pending.write(json.dumps(payload, sort_keys=True).encode() + b"\n")
+                        self._pending_unsynced += 1
+                    else:
+                        data = b"".join(json.dumps(v, sort_keys=True).encode() + b"\n" for v in payload)
+                        self._pending.close()
+                        _atomic_write(self._path("pending.log"), data)
+                        self._pending = open(self._path("pending.log"), "ab")
+                        self._pending_unsynced = 0
+                self._pending.flush()
+                # One fsync covers every waiter in the batch, so a group of votes shares it
+                if waiters or self._pending_unsynced >= PENDING_FSYNC_INTERVAL:
+                    os.fsync(self._pending.fileno())
+                    self._pending_unsynced = 0
+            except Exception as e:
+                logger.exception("pending log write failed")
+                for waiter in waiters:
+                    waiter.set_exception(e)
+            else:
+                for waiter in waiters:
+                    waiter.set_result(None)
+            if stopping:
+                return
+
+    def should_checkpoint(self, height):
+        return height % self.checkpoint_interval == 0
+
+    def write_checkpoint(self, height, tip_hash, tally, total_votes, election_tallies):
+        checkpoint = {
+            "height": height, "tip_hash": tip_hash, "tally": tally,
+            "total_votes": total_votes, "election_tallies": election_tallies
+        }
+        _atomic_write(self._path("checkpoint.json"), json.dumps(checkpoint).encode())
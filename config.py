@@ -8,3 +8,89 @@ load_dotenv()  # Load variables from .env file if present
 SECRET_KEY = os.getenv("SECRET_KEY", "blockvotechaning")  # fallback default
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+# Proof-of-work mining
+MINING_WORKERS = int(os.getenv("MINING_WORKERS", os.cpu_count() or 1))
+MINING_CHUNK_SIZE = int(os.getenv("MINING_CHUNK_SIZE", 50000))
+MINING_PARALLEL_MIN_DIFFICULTY = int(os.getenv("MINING_PARALLEL_MIN_DIFFICULTY", 5))
+
+# Automatic block sealing
+SEAL_BATCH_SIZE = int(os.getenv("SEAL_BATCH_SIZE", 500))
+SEAL_MAX_AGE_SECONDS = float(os.getenv("SEAL_MAX_AGE_SECONDS", 10))
+SEAL_POLL_INTERVAL = float(os.getenv("SEAL_POLL_INTERVAL", 0.5))
+MAX_PENDING_VOTES = int(os.getenv("MAX_PENDING_VOTES", 10000))
+CONFIRMATION_SAMPLES = int(os.getenv("CONFIRMATION_SAMPLES", 10000))
+
+# Durable chain storage
+CHAIN_DATA_DIR = os.getenv("CHAIN_DATA_DIR", "./chain_data")
+CHAIN_SEGMENT_BYTES = int(os.getenv("CHAIN_SEGMENT_BYTES", 64 * 1024 * 1024))
+CHAIN_CHECKPOINT_INTERVAL = int(os.getenv("CHAIN_CHECKPOINT_INTERVAL", 100))
+PENDING_FSYNC_INTERVAL = int(os.getenv("PENDING_FSYNC_INTERVAL", 64))
+
+# /chain pagination
+CHAIN_PAGE_MAX_BLOCKS = int(os.getenv("CHAIN_PAGE_MAX_BLOCKS", 1000))
+CHAIN_SERIALIZED_CACHE_SIZE = int(os.getenv("CHAIN_SERIALIZED_CACHE_SIZE", 4096))
+
+# bcrypt hashing pool
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 64))
+
+# Database engine
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./members.db")
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    .replace("postgresql://", "postgresql+asyncpg://", 1)
+)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+
+# Bulk member import / verification
+BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", 500))
+BULK_HASH_CONCURRENCY = int(os.getenv("BULK_HASH_CONCURRENCY", 2))
+BULK_MAX_ERRORS = int(os.getenv("BULK_MAX_ERRORS", 1000))
+
+# Admin member listing
+MEMBERS_PAGE_DEFAULT = int(os.getenv("MEMBERS_PAGE_DEFAULT", 100))
+MEMBERS_PAGE_MAX = int(os.getenv("MEMBERS_PAGE_MAX", 1000))
+
+# Group-commit vote ingestion
+INGEST_MAX_BATCH = int(os.getenv("INGEST_MAX_BATCH", 256))
+INGEST_MAX_WAIT_MS = float(os.getenv("INGEST_MAX_WAIT_MS", 5))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 10000))
+
+# Logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+
+# Consensus: "pow" (proof-of-work) or "poa" (proof-of-authority, HMAC-signed by the operator key)
+CONSENSUS = os.getenv("CONSENSUS", "pow")
+POA_KEY_FILE = os.getenv("POA_KEY_FILE", "./poa.key")
+# Consensus types still accepted for blocks sealed before a switch, e.g. "pow" after moving to poa
+LEGACY_CONSENSUS = [name.strip() for name in os.getenv("LEGACY_CONSENSUS", "").split(",") if name.strip()]
+# Lowest proof-of-work difficulty a stored or synced block may claim; defaults to the current difficulty
+MIN_DIFFICULTY = int(os.getenv("MIN_DIFFICULTY")) if os.getenv("MIN_DIFFICULTY") else None
+
+# Shared chain across uvicorn workers / local nodes using the same database and CHAIN_DATA_DIR
+CHAIN_SHARED = os.getenv("CHAIN_SHARED", "false").lower() in ("1", "true", "yes")
+CHAIN_SYNC_INTERVAL = float(os.getenv("CHAIN_SYNC_INTERVAL", 0.2))
+
+# Authenticated-principal cache. Invalidation only clears the worker that made the change:
+# with several workers, the others keep a revoked is_admin / is_verified for up to the TTL,
+# so the default is much shorter in shared mode.
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", 5 if CHAIN_SHARED else 60))
+
+# Live results push (WebSocket / SSE)
+LIVE_MAX_SUBSCRIBERS = int(os.getenv("LIVE_MAX_SUBSCRIBERS", 10000))
+LIVE_KEEPALIVE_SECONDS = float(os.getenv("LIVE_KEEPALIVE_SECONDS", 15))
+LIVE_SEND_TIMEOUT = float(os.getenv("LIVE_SEND_TIMEOUT", 5))
+
+# Elections; cached snapshots may lag a window change on other workers by up to the TTL
+ELECTION_CACHE_SIZE = int(os.getenv("ELECTION_CACHE_SIZE", 1000))
+ELECTION_CACHE_TTL = float(os.getenv("ELECTION_CACHE_TTL", 5))
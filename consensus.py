@@ -0,0 +1,98 @@
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+from time import perf_counter
+
+from miner import find_nonce
+from metrics import MINING_DURATION, MINING_HASH_RATE
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Block sealing strategies
+# ---------------------------
+#
+# A consensus seals a block (fills in its nonce and any signature) and returns
+# the block hash; verify() checks a sealed block. Each block records the name
+# of the consensus that sealed it, and validation dispatches on that name,
+# accepting only the configured consensus and any explicitly allowed legacy ones.
+
+class ProofOfWork:
+    name = "pow"
+
+    def seal(self, chain, block):
+        started = perf_counter()
+        nonce, block_hash = find_nonce(chain.block_string(block), block['difficulty'])
+        elapsed = perf_counter() - started
+        MINING_DURATION.observe(elapsed)
+        # Nonces are searched roughly in order, so the winning nonce approximates the attempts made
+        MINING_HASH_RATE.set((nonce + 1) / elapsed if elapsed else 0)
+        block['nonce'] = nonce
+        return block_hash
+
+    def verify(self, chain, block):
+        # Checked at the difficulty the block was sealed with; older blocks did not record it.
+        # The recorded difficulty is part of the forged header too, so it must meet the floor.
+        difficulty = block.get('difficulty', chain.difficulty)
+        if not isinstance(difficulty, int) or difficulty < chain.difficulty_floor():
+            return False
+        block_hash = chain.hash_block(block)
+        return block_hash == block.get('hash') and block_hash.startswith('0' * difficulty)
+
+
+class ProofOfAuthority:
+    """Seals blocks by signing the header hash with the operator's HMAC key"""
+    name = "poa"
+
+    def __init__(self, key_file):
+        self.key_file = key_file
+        self._key = None
+
+    def load_key(self, create=False):
+        """The operator key; only sealing may create it, so verifying never invents one"""
+        if self._key is None:
+            if not os.path.exists(self.key_file):
+                if not create:
+                    raise RuntimeError(f"Proof-of-authority key file {self.key_file} not found")
+                logger.warning("generating new proof-of-authority key", extra={"key_file": self.key_file})
+                fd = os.open(self.key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, "w") as f:
+                    f.write(secrets.token_hex(32))
+            with open(self.key_file) as f:
+                self._key = bytes.fromhex(f.read().strip())
+        return self._key
+
+    @staticmethod
+    def key_id(key):
+        """Short fingerprint identifying the signing key without revealing it"""
+        return hashlib.sha256(key).hexdigest()[:16]
+
+    @staticmethod
+    def _sign(key, block_hash):
+        return hmac.new(key, block_hash.encode(), hashlib.sha256).hexdigest()
+
+    def seal(self, chain, block):
+        key = self.load_key(create=True)
+        started = perf_counter()
+        block['nonce'] = 0
+        block_hash = chain.hash_block(block)
+        block['signer'] = self.key_id(key)
+        block['signature'] = self._sign(key, block_hash)
+        MINING_DURATION.observe(perf_counter() - started)
+        return block_hash
+
+    def verify(self, chain, block):
+        key = self.load_key()
+        block_hash = chain.hash_block(block)
+        return (
+            block_hash == block.get('hash')
+            and block.get('signer') == self.key_id(key)
+            and hmac.compare_digest(self._sign(key, block_hash), block.get('signature', ''))
+        )
+
+
+def build_consensus(key_file):
+    """All known consensus implementations, keyed by the name recorded in blocks"""
+    return {c.name: c for c in (ProofOfWork(), ProofOfAuthority(key_file))}
@@ -1,22 +1,73 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
+from time import perf_counter
+
+from metrics import DB_QUERY_DURATION
+
+from config import (
+    DATABASE_URL, ASYNC_DATABASE_URL, DB_ECHO,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    SQLITE_BUSY_TIMEOUT_MS, SQLITE_MMAP_SIZE
+)
 
 # ---------------------------
 # SQLite + SQLAlchemy Setup
 # ---------------------------
 
-DATABASE_URL = "sqlite:///./members.db"
-# if os.path.exists("members.db"):
-#     os.remove("members.db")  # Remove existing database for fresh start
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    
-    echo=True  # Set to True for SQL query logging
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def _engine_options(url: str) -> dict:
+    options = {"echo": DB_ECHO}  # Statement logging is opt-in via DB_ECHO
+    if _is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False}
+        if ":memory:" in url or url.rstrip("/").endswith(":"):
+            return options
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=not _is_sqlite(url),
     )
+    return options
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+def _track_queries(engine):
+    """Time every statement executed on a synchronous engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        operation = statement.split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERY_DURATION.observe(perf_counter() - context._query_start, operation)
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL))
+
+if _is_sqlite(DATABASE_URL):
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+if _is_sqlite(ASYNC_DATABASE_URL):
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+_track_queries(engine)
+_track_queries(async_engine.sync_engine)
+
 SessionLocal = sessionmaker(bind=engine)
+# Objects stay usable after commit; async sessions can't lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
 # Dependency for FastAPI
@@ -25,4 +76,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency for async routes
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,59 @@
+from time import time
+from typing import Optional
+
+from sqlalchemy import select
+
+from cache import TTLCache
+from config import ELECTION_CACHE_SIZE, ELECTION_CACHE_TTL
+from models import Election
+
+# ---------------------------
+# Elections
+# ---------------------------
+
+# Election snapshots keyed by id; votes look the election up on every request
+election_cache = TTLCache(ELECTION_CACHE_SIZE, ELECTION_CACHE_TTL)
+
+class ElectionRecord:
+    """Detached snapshot of an election, safe to cache and share between requests"""
+    __slots__ = ("id", "name", "candidates", "opens_at", "closes_at")
+
+    def __init__(self, election: Election):
+        self.id = election.id
+        self.name = election.name
+        self.candidates = tuple(election.candidates)
+        self.opens_at = election.opens_at
+        self.closes_at = election.closes_at
+
+    def is_open(self, now: Optional[float] = None) -> bool:
+        now = time() if now is None else now
+        return (
+            (self.opens_at is None or self.opens_at <= now)
+            and (self.closes_at is None or now < self.closes_at)
+        )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "candidates": list(self.candidates),
+            "opens_at": self.opens_at,
+            "closes_at": self.closes_at,
+            "is_open": self.is_open()
+        }
+
+async def get_election(db, election_id: int) -> Optional[ElectionRecord]:
+    """Look up an election through the cache"""
+    record = election_cache.get(election_id)
+    if record is None:
+        result = await db.execute(select(Election).where(Election.id == election_id))
+        election = result.scalars().first()
+        if election is None:
+            return None
+        record = ElectionRecord(election)
+        election_cache.set(election_id, record)
+    return record
+
+def invalidate_election(election_id: int):
+    """Drop a cached election after its window changes"""
+    election_cache.invalidate(election_id)
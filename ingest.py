@@ -0,0 +1,177 @@
+import asyncio
+from time import time
+from typing import Optional
+
+from sqlalchemy import exists, insert, literal, select, update
+
+from blockchain import DuplicateVote
+from config import INGEST_MAX_BATCH, INGEST_MAX_WAIT_MS, INGEST_QUEUE_SIZE
+from models import ElectionVoter, Member, PendingVote
+
+# ---------------------------
+# Group-commit vote ingestion
+# ---------------------------
+
+class AlreadyVoted(Exception):
+    pass
+
+
+class IngestQueueFull(Exception):
+    pass
+
+
+class VoteIngestor:
+    """Coalesces votes into group commits and only then adds them to the pending pool
+
+    Each vote flips has_voted with a conditional UPDATE inside the group's
+    transaction, so a second vote from the same member matches no row and is
+    rejected atomically, even when both arrive in the same group. A vote in an
+    election instead inserts its (election, member) participation row only if
+    none exists, backed by the table's unique index.
+
+    Otherwise a group's votes are acknowledged only once they are fsynced to
+    the pending journal, so an acknowledged vote survives a crash. With
+    shared=True the votes are written to the pending_votes table in the
+    same transaction instead, for whichever process is sealing to pick up.
+    """
+
+    def __init__(self, blockchain, session_factory, on_voted=None, shared=False):
+        self.blockchain = blockchain
+        self.session_factory = session_factory
+        self.on_voted = on_voted
+        self.shared = shared
+        self.groups_committed = 0
+        self.votes_committed = 0
+        self._queue = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+        self._task = None
+
+    async def submit(self, member_id: int, username: str, candidate: str, election: Optional[int] = None):
+        """Queue a vote and wait until its group commits; returns the pending vote"""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((member_id, username, candidate, election, future))
+        except asyncio.QueueFull:
+            raise IngestQueueFull()
+        return await future
+
+    async def _next_group(self):
+        group = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + INGEST_MAX_WAIT_MS / 1000
+        while len(group) < INGEST_MAX_BATCH:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                group.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return group
+
+    async def _commit_group(self, group):
+        accepted = []
+        async with self.session_factory() as db:
+            try:
+                for item in group:
+                    result = await db.execute(self._participation(item[0], item[3]))
+                    if result.rowcount == 1:
+                        accepted.append(item)
+                    elif not item[4].done():
+                        item[4].set_exception(AlreadyVoted())
+                if self.shared and accepted:
+                    stamped = [
+                        {"member_id": m, "election_id": e, "username": u, "candidate": c, "timestamp": time()}
+                        for m, u, c, e, _ in accepted
+                    ]
+                    await db.execute(insert(PendingVote), stamped)
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                for item in group:
+                    if not item[4].done():
+                        item[4].set_exception(e)
+                return
+
+        self.groups_committed += 1
+        self.votes_committed += len(accepted)
+        if self.shared:
+            for (_, username, _, election, future), vote in zip(accepted, stamped):
+                if self.on_voted is not None and election is None:
+                    self.on_voted(username)
+                if not future.done():
+                    future.set_result({**vote, "member_id": str(vote["member_id"])})
+            return
+        added = []
+        for member_id, username, candidate, election, future in accepted:
+            if self.on_voted is not None and election is None:
+                self.on_voted(username)
+            # The vote is recorded even if its request has gone away; participation is already committed
+            try:
+                vote = self.blockchain.add_vote(str(member_id), username, candidate, election=election)
+            except DuplicateVote:
+                # The chain already holds a vote the database had lost track of
+                if not future.done():
+                    future.set_exception(AlreadyVoted())
+                continue
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            added.append((future, vote))
+        if not added:
+            return
+        # Acknowledge only once the group's votes are fsynced to the pending journal
+        try:
+            await asyncio.wrap_future(self.blockchain.flush_pending())
+        except Exception as e:
+            for future, _ in added:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, vote in added:
+            if not future.done():
+                future.set_result(vote)
+
+    @staticmethod
+    def _participation(member_id, election):
+        """Statement marking a member as voted; it affects no row if they already have"""
+        if election is None:
+            return (
+                update(Member)
+                .where(Member.id == member_id, Member.has_voted == False)  # noqa: E712
+                .values(has_voted=True)
+            )
+        already = exists().where(ElectionVoter.election_id == election, ElectionVoter.member_id == member_id)
+        return insert(ElectionVoter).from_select(
+            ["election_id", "member_id", "voted_at"],
+            select(literal(election), literal(member_id), literal(time())).where(~already)
+        )
+
+    async def _run(self):
+        while True:
+            group = await self._next_group()
+            await self._commit_group(group)
+            for _ in group:
+                self._queue.task_done()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            # Let queued votes commit before shutting down
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        return {
+            "queue_depth": self._queue.qsize(),
+            "groups_committed": self.groups_committed,
+            "votes_committed": self.votes_committed,
+            "mean_group_size": self.votes_committed / self.groups_committed if self.groups_committed else None
+        }
@@ -0,0 +1,131 @@
+import asyncio
+
+from config import LIVE_MAX_SUBSCRIBERS
+
+# ---------------------------
+# Live results push
+# ---------------------------
+
+class Subscriber:
+    """One live-results client; undelivered deltas are merged into a single update"""
+
+    def __init__(self, block_index, election=None):
+        self.block_index = block_index
+        self.election = election
+        self._pending = None
+        self._ready = asyncio.Event()
+
+    def offer(self, delta):
+        if delta["block_index"] <= self.block_index:
+            return
+        if self._pending is None:
+            self._pending = {**delta, "increments": dict(delta["increments"])}
+        else:
+            # A slow consumer gets one coalesced delta instead of a growing backlog
+            increments = self._pending["increments"]
+            for candidate, count in delta["increments"].items():
+                increments[candidate] = increments.get(candidate, 0) + count
+            self._pending.update({k: v for k, v in delta.items() if k != "increments"})
+        self._ready.set()
+
+    async def next(self, timeout=None):
+        """Wait for the next (possibly coalesced) delta; returns None on timeout"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._ready.clear()
+        delta, self._pending = self._pending, None
+        self.block_index = delta["block_index"]
+        return delta
+
+
+class ResultsBroadcaster:
+    """Fans sealed-block deltas out to live subscribers without blocking the sealer
+
+    Blocks arrive on the miner or sync thread; they are handed to the event loop
+    and applied to the broadcaster's own tallies there, so every snapshot and the
+    deltas that follow it are consistent with each other. Tallies are kept per
+    scope: 0 for the untagged ballot, otherwise the election id, and each
+    subscriber only receives its own scope's deltas.
+    """
+
+    def __init__(self, blockchain):
+        self.blockchain = blockchain
+        self.subscribers = set()
+        self.dropped = 0
+        self._loop = None
+        self._tallies = {}
+        self._block_index = 0
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._tallies = {0: self.blockchain.count_votes()}
+        for election in list(self.blockchain.election_tallies):
+            self._tallies[election] = self.blockchain.count_votes(election)
+        self._block_index = self.blockchain.get_last_block()['index']
+        self.blockchain.add_listener(self.on_block)
+
+    def on_block(self, block):
+        if self._loop is None:
+            return
+        votes = block['votes']
+        increments = {0: votes.candidate_counts(), **votes.election_counts()}
+        self._loop.call_soon_threadsafe(self._publish, block['index'], increments)
+
+    def _publish(self, block_index, increments):
+        if block_index <= self._block_index:
+            return
+        for scope, counts in increments.items():
+            tally = self._tallies.setdefault(scope, {})
+            for candidate, count in counts.items():
+                tally[candidate] = tally.get(candidate, 0) + count
+        self._block_index = block_index
+        pending = len(self.blockchain.current_votes)
+        deltas = {}
+        for subscriber in self.subscribers:
+            scope = subscriber.election or 0
+            # Blocks without votes in an election are not worth waking its subscribers for
+            if scope and scope not in increments:
+                continue
+            delta = deltas.get(scope)
+            if delta is None:
+                delta = deltas[scope] = {
+                    "type": "delta",
+                    "block_index": block_index,
+                    "increments": increments.get(scope, {}),
+                    "total_votes_cast": sum(self._tallies.get(scope, {}).values()),
+                    "pending_votes": pending,
+                }
+                if scope:
+                    delta["election"] = scope
+            subscriber.offer(delta)
+
+    def snapshot(self, election=None):
+        tally = self._tallies.get(election or 0, {})
+        snapshot = {
+            "type": "snapshot",
+            "vote_counts": dict(tally),
+            "total_votes_cast": sum(tally.values()),
+            "last_block_mined": self._block_index,
+            "pending_votes": len(self.blockchain.current_votes),
+        }
+        if election is not None:
+            snapshot["election"] = election
+        return snapshot
+
+    def subscribe(self, election=None):
+        """Register a subscriber to one election, or the untagged ballot; returns (subscriber, snapshot) or None when full"""
+        if len(self.subscribers) >= LIVE_MAX_SUBSCRIBERS:
+            return None
+        subscriber = Subscriber(self._block_index, election)
+        self.subscribers.add(subscriber)
+        return subscriber, self.snapshot(election)
+
+    def unsubscribe(self, subscriber, dropped=False):
+        self.subscribers.discard(subscriber)
+        if dropped:
+            self.dropped += 1
+
+    def stats(self):
+        return {"subscribers": len(self.subscribers), "dropped": self.dropped, "block_index": self._block_index}
@@ -1,26 +1,118 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import select, insert, update, func, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, validator
-from datetime import timedelta
-from typing import Optional
-from time import time
-from database import SessionLocal, engine
-from models import Member  # Changed from Voter to Member
+from datetime import datetime, timedelta
+from typing import List, Optional
+import csv
+import json
+from time import perf_counter
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+from database import SessionLocal, AsyncSessionLocal, engine, async_engine, get_db, get_async_db
+from bootstrap import exclusive, migrate, seed_admin
+from models import Member, Election  # Changed from Voter to Member
 from auth import (
-    hash_password, verify_password, is_admin,
-    create_access_token, get_current_user,
+    is_admin,
+    create_access_token, get_current_user, get_optional_user,
+    MemberRecord, invalidate_member, cache_stats,
+    hash_password_async, verify_password_async, password_pool,
     ACCESS_TOKEN_EXPIRE_MINUTES, oauth2_scheme
 )
-from blockchain import Blockchain
+from blockchain import Blockchain, PENDING
+from chainstore import ChainStore
+from config import (
+    CHAIN_DATA_DIR, CHAIN_PAGE_MAX_BLOCKS,
+    BULK_IMPORT_BATCH_SIZE, BULK_HASH_CONCURRENCY, BULK_MAX_ERRORS,
+    MEMBERS_PAGE_DEFAULT, MEMBERS_PAGE_MAX, CHAIN_SHARED,
+    LIVE_KEEPALIVE_SECONDS, LIVE_SEND_TIMEOUT
+)
+from miner import MiningJobs
+from scheduler import SealingScheduler
+from ingest import VoteIngestor, AlreadyVoted, IngestQueueFull
+from logs import configure_logging
+from sync import ChainSync, acquire_leadership, wait_for_genesis
+from live import ResultsBroadcaster
+from elections import get_election, invalidate_election, ElectionRecord
+from metrics import Gauge, REQUEST_LATENCY, REQUESTS_IN_FLIGHT, registry
 
-# Create DB tables
-import models
-models.Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
 
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+# Built once by the lifespan bootstrap; importing this module has no side effects
+chain_store = None
+blockchain = None
+mining_jobs = None
+sealer = None
+ingestor = None
+chain_sync = None
+broadcaster = None
+
+def bootstrap():
+    """Migrate, seed and build this worker's chain node; later calls are no-ops"""
+    global chain_store, blockchain, mining_jobs, sealer, ingestor, chain_sync, broadcaster
+    if blockchain is not None:
+        return
+    configure_logging()
+    started = perf_counter()
+    with exclusive(CHAIN_DATA_DIR):
+        migrate(engine)
+        seed_admin(SessionLocal)
+    
+    # With CHAIN_SHARED, one process writes the chain and the others follow it
+    writer_lock = acquire_leadership(CHAIN_DATA_DIR) if CHAIN_SHARED else None
+    chain_store = ChainStore(CHAIN_DATA_DIR).open(readonly=CHAIN_SHARED and writer_lock is None)
+    if chain_store.readonly:
+        wait_for_genesis(chain_store)
+    blockchain = Blockchain(store=chain_store)
+    mining_jobs = MiningJobs()
+    sealer = SealingScheduler(blockchain, mining_jobs)
+    ingestor = VoteIngestor(blockchain, AsyncSessionLocal, on_voted=invalidate_member, shared=CHAIN_SHARED)
+    chain_sync = (
+        ChainSync(blockchain, chain_store, sealer, AsyncSessionLocal, CHAIN_DATA_DIR, writer_lock)
+        if CHAIN_SHARED else None
+    )
+    broadcaster = ResultsBroadcaster(blockchain)
+    logger.info("node ready", extra={"height": len(blockchain.chain), "seconds": perf_counter() - started})
+
+def teardown():
+    """Forget the node built by bootstrap() once its resources are closed"""
+    global chain_store, blockchain, mining_jobs, sealer, ingestor, chain_sync, broadcaster
+    chain_store = blockchain = mining_jobs = sealer = ingestor = chain_sync = broadcaster = None
+
+# Read at scrape time so the hot paths never touch them
+Gauge("pending_votes", "Votes waiting to be sealed into a block",
+      function=lambda: sealer.queue_depth() if sealer else 0)
+Gauge("chain_height", "Number of blocks in the chain", function=lambda: len(blockchain.chain) if blockchain else 0)
+Gauge("ingest_queue_depth", "Votes waiting for a group commit",
+      function=lambda: ingestor.stats()["queue_depth"] if ingestor else 0)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Blocking work (schema checks, store recovery, waiting for the writer) stays off the event loop
+    await asyncio.to_thread(bootstrap)
+    broadcaster.start()
+    ingestor.start()
+    sealer.start()
+    if chain_sync is not None:
+        chain_sync.start()
+    yield
+    await ingestor.stop()
+    await sealer.stop()
+    if chain_sync is not None:
+        await chain_sync.stop()
+    mining_jobs.shutdown()
+    chain_store.close()
+    await async_engine.dispose()
+    teardown()
+
+app = FastAPI(lifespan=lifespan)
 # initialise CORS
 app.add_middleware(
     CORSMiddleware,
@@ -29,55 +121,25 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-blockchain = Blockchain()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def create_initial_admin():
-    db = SessionLocal()
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    REQUESTS_IN_FLIGHT.inc()
+    started = perf_counter()
+    status_code = 500
     try:
-        admin = db.query(Member).filter(Member.username == "admin").first()
-        if not admin:
-            print("Creating initial admin account...")
-            # Create a hashed password for the admin
-            hashed_pw = hash_password("admin123")
-            admin = Member(
-                username="admin",
-                hashed_password=hashed_pw,  # Use hashed password
-                full_name="System Admin",
-                is_admin=True,
-                is_verified=True
-            )
-            db.add(admin)
-            db.commit()
-            print("Initial admin account created successfully")
-        else:
-            print("Admin account already exists")
-    except Exception as e:
-        print(f"Error creating admin: {e}")
-        db.rollback()
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
     finally:
-        db.close()
-
-# Call this during startup
-create_initial_admin()
-
-# Call this during startup
-with SessionLocal() as db:
-    admin = db.query(Member).filter(Member.username == "admin").first()
-    if admin:
-        admin.is_verified = True
-        db.commit()
-        print("Admin verified!")
-    else:
-        print("Admin not found.")
+        REQUESTS_IN_FLIGHT.dec()
+        # Label by route template, not raw path, to keep series bounded
+        route = request.scope.get("route")
+        REQUEST_LATENCY.observe(
+            perf_counter() - started,
+            request.method, route.path if route else "unmatched", str(status_code)
+        )
 
 # Pydantic schemas
 class RegisterMember(BaseModel):
@@ -101,21 +163,51 @@ class RegisterMember(BaseModel):
 
 class VoteInput(BaseModel):
     candidate: str
+    election: Optional[int] = None
+
+class ElectionInput(BaseModel):
+    name: str
+    candidates: List[str]
+    opens_at: Optional[datetime] = None
+    closes_at: Optional[datetime] = None
+
+    @validator('candidates')
+    def candidates_distinct(cls, v):
+        if not v:
+            raise ValueError("An election needs at least one candidate")
+        if len(set(v)) != len(v):
+            raise ValueError("Candidates must be distinct")
+        return v
+
+    @validator('closes_at')
+    def closes_after_opening(cls, v, values, **kwargs):
+        if v and values.get('opens_at') and v <= values['opens_at']:
+            raise ValueError("closes_at must be after opens_at")
+        return v
+
+class ElectionWindow(BaseModel):
+    opens_at: Optional[datetime] = None
+    closes_at: Optional[datetime] = None
 
 class AdminVerification(BaseModel):
     is_verified: bool
     notes: Optional[str] = None
 
+class BulkVerification(BaseModel):
+    member_ids: List[int]
+    is_verified: bool
+    notes: Optional[str] = None
+
 @app.get("/")
 def root():
     return {"message": "Blockchain Voting API is running"}
 @app.post("/register-admin")
-def register_admin(
+async def register_admin(
     admin_data: RegisterMember, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # In production, protect this endpoint with a super-secret key
-    hashed_password = hash_password(admin_data.password)
+    hashed_password = await hash_password_async(admin_data.password)
     
     admin = Member(
         username=admin_data.username,
@@ -126,17 +218,19 @@ def register_admin(
     )
     
     db.add(admin)
-    db.commit()
+    await db.commit()
+    invalidate_member(admin.username)
     
     return {"message": "Admin account created"}
 
 @app.post("/register")
-async def register(member: RegisterMember, db: Session = Depends(get_db)):
-    existing_member = db.query(Member).filter(Member.username == member.username).first()
+async def register(member: RegisterMember, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(Member).where(Member.username == member.username))
+    existing_member = result.scalars().first()
     if existing_member:
         raise HTTPException(status_code=400, detail="Username already exists")
     
-    hashed_password = hash_password(member.password)
+    hashed_password = await hash_password_async(member.password)
     
     new_member = Member(
         full_name=member.full_name,
@@ -146,40 +240,257 @@ async def register(member: RegisterMember, db: Session = Depends(get_db)):
     )
     
     db.add(new_member)
-    db.commit()
+    await db.commit()
     
     return {"message": "Registration submitted for verification", "member_id": new_member.id}
 
 @app.get("/admin/members")
-def get_all_members(
-    current_user: Member = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_all_members(
+    cursor: Optional[int] = None,
+    limit: int = MEMBERS_PAGE_DEFAULT,
+    is_verified: Optional[bool] = None,
+    has_voted: Optional[bool] = None,
+    current_user: MemberRecord = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin access required")
+    if not 1 <= limit <= MEMBERS_PAGE_MAX:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MEMBERS_PAGE_MAX}")
     
-    all_members = db.query(Member).order_by(Member.created_at.desc()).all()
-    return [
-        {
-            "id": m.id,
-            "username": m.username,
-            "full_name": m.full_name,
-            "is_verified": m.is_verified,
-            "has_voted": m.has_voted,
-            "is_admin": m.is_admin,
-            "created_at": m.created_at.isoformat() if m.created_at else None
-        }
-        for m in all_members
-    ]
+    # Project plain columns; no ORM objects are built for the listing
+    query = select(
+        Member.id, Member.username, Member.full_name, Member.is_verified,
+        Member.has_voted, Member.is_admin, Member.created_at
+    )
+    if is_verified is not None:
+        query = query.where(Member.is_verified == is_verified)
+    if has_voted is not None:
+        query = query.where(Member.has_voted == has_voted)
+    if cursor is not None:
+        # The cursor is the last id seen; its created_at is looked up in-database so
+        # both sides of the comparison share SQLite's stored datetime format
+        cursor_created = select(Member.created_at).where(Member.id == cursor).scalar_subquery()
+        query = query.where(or_(
+            Member.created_at < cursor_created,
+            and_(Member.created_at == cursor_created, Member.id < cursor)
+        ))
+    query = query.order_by(Member.created_at.desc(), Member.id.desc()).limit(limit + 1)
+    
+    rows = (await db.execute(query)).all()
+    page = rows[:limit]
+    return {
+        "members": [
+            {
+                "id": m.id,
+                "username": m.username,
+                "full_name": m.full_name,
+                "is_verified": m.is_verified,
+                "has_voted": m.has_voted,
+                "is_admin": m.is_admin,
+                "created_at": m.created_at.isoformat() if m.created_at else None
+            }
+            for m in page
+        ],
+        "next_cursor": page[-1].id if len(rows) > limit else None
+    }
+
+@app.get("/admin/members/counts")
+async def get_member_counts(
+    current_user: MemberRecord = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    result = await db.execute(
+        select(Member.is_verified, Member.has_voted, func.count())
+        .group_by(Member.is_verified, Member.has_voted)
+    )
+    counts = {"total": 0, "verified": 0, "pending": 0, "voted": 0}
+    for verified, voted, count in result.all():
+        counts["total"] += count
+        counts["verified" if verified else "pending"] += count
+        if voted:
+            counts["voted"] += count
+    
+    return counts
+
+async def _request_lines(request: Request):
+    """Yield raw lines from the request body as it streams in"""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if buffer:
+        yield buffer.rstrip(b"\r")
+
+async def _import_rows(request: Request):
+    """Yield (row_number, row dict or parse error) from a CSV or NDJSON body"""
+    is_csv = "csv" in request.headers.get("content-type", "")
+    header = None
+    row_number = 0
+    async for raw in _request_lines(request):
+        if not raw.strip():
+            continue
+        if is_csv and header is None:
+            try:
+                header = [name.strip() for name in next(csv.reader([raw.decode("utf-8")]))]
+            except UnicodeDecodeError:
+                raise HTTPException(status_code=400, detail="CSV header is not valid UTF-8")
+            continue
+        row_number += 1
+        try:
+            line = raw.decode("utf-8")
+            if is_csv:
+                row = dict(zip(header, next(csv.reader([line]))))
+            else:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError("row must be a JSON object")
+        except ValueError as e:
+            yield row_number, f"Unparseable row: {e}"
+            continue
+        yield row_number, row
+
+def _validate_import_row(row):
+    for field in ("full_name", "username", "password"):
+        if not str(row.get(field) or "").strip():
+            return f"Missing {field}"
+    if len(str(row["password"])) < 8:
+        return "Password must be at least 8 characters"
+    return None
+
+async def _import_batch(db: AsyncSession, batch, seen, errors):
+    """Hash and insert one batch of rows in a single transaction; returns rows inserted"""
+    usernames = [row["username"] for _, row in batch]
+    result = await db.execute(select(Member.username).where(Member.username.in_(usernames)))
+    existing = set(result.scalars().all())
+    
+    accepted = []
+    for row_number, row in batch:
+        if row["username"] in existing or row["username"] in seen:
+            errors.append({"row": row_number, "username": row["username"], "error": "Username already exists"})
+            continue
+        seen.add(row["username"])
+        accepted.append((row_number, row))
+    
+    # Cap in-flight hashes so logins aren't starved by the import
+    limit = asyncio.Semaphore(BULK_HASH_CONCURRENCY)
+    
+    async def hash_row(row):
+        async with limit:
+            return await hash_password_async(str(row["password"]))
+    
+    hashes = await asyncio.gather(*(hash_row(row) for _, row in accepted), return_exceptions=True)
+    values = []
+    for (row_number, row), hashed in zip(accepted, hashes):
+        if isinstance(hashed, Exception):
+            errors.append({"row": row_number, "username": row["username"], "error": "Password hashing failed"})
+            continue
+        values.append({
+            "full_name": str(row["full_name"]),
+            "username": row["username"],
+            "hashed_password": hashed,
+            "is_verified": str(row.get("is_verified", "")).lower() in ("1", "true", "yes")
+        })
+    if not values:
+        return 0
+    
+    try:
+        await db.execute(insert(Member), values)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        for row_number, row in accepted:
+            errors.append({"row": row_number, "username": row["username"], "error": "Batch rejected by database constraint"})
+        return 0
+    return len(values)
+
+@app.post("/admin/members/import")
+async def import_members(
+    request: Request,
+    current_user: MemberRecord = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    imported = 0
+    errors = []
+    seen = set()
+    batch = []
+    async for row_number, row in _import_rows(request):
+        if isinstance(row, str):
+            errors.append({"row": row_number, "username": None, "error": row})
+            continue
+        error = _validate_import_row(row)
+        if error:
+            errors.append({"row": row_number, "username": row.get("username"), "error": error})
+            continue
+        row["username"] = str(row["username"]).strip()
+        batch.append((row_number, row))
+        if len(batch) >= BULK_IMPORT_BATCH_SIZE:
+            imported += await _import_batch(db, batch, seen, errors)
+            batch = []
+    if batch:
+        imported += await _import_batch(db, batch, seen, errors)
+    
+    failed = len(errors)
+    return {
+        "imported": imported,
+        "failed": failed,
+        "errors": errors[:BULK_MAX_ERRORS],
+        "errors_truncated": failed > BULK_MAX_ERRORS
+    }
+
+@app.patch("/admin/members/verify")
+async def bulk_verify_members(
+    verification: BulkVerification,
+    current_user: MemberRecord = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    member_ids = list(dict.fromkeys(verification.member_ids))
+    values = {"is_verified": verification.is_verified}
+    if verification.notes:
+        values["verification_notes"] = verification.notes
+    
+    updated = []
+    for start in range(0, len(member_ids), BULK_IMPORT_BATCH_SIZE):
+        chunk = member_ids[start:start + BULK_IMPORT_BATCH_SIZE]
+        result = await db.execute(
+            update(Member).where(Member.id.in_(chunk)).values(**values).returning(Member.id, Member.username)
+        )
+        updated.extend(result.all())
+    await db.commit()
+    
+    for _, username in updated:
+        invalidate_member(username)
+    found = {member_id for member_id, _ in updated}
+    errors = [{"member_id": member_id, "error": "Member not found"} for member_id in member_ids if member_id not in found]
+    
+    return {
+        "updated": len(found),
+        "failed": len(errors),
+        "errors": errors[:BULK_MAX_ERRORS],
+        "errors_truncated": len(errors) > BULK_MAX_ERRORS
+    }
 
 @app.patch("/verify-member/{member_id}")
 def verify_member(
     member_id: int,
     verification: AdminVerification,
-    current_user: Member = Depends(get_current_user),
+    current_user: MemberRecord = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    print(f"Admin {current_user.username} is verifying member {member_id} with data: {verification}")
+    logger.info("member verification", extra={
+        "admin": current_user.username, "member_id": member_id, "is_verified": verification.is_verified
+    })
     if not is_admin(current_user):
         raise HTTPException(status_code=403, detail="Admin access required")
     
@@ -192,16 +503,18 @@ def verify_member(
         member.verification_notes = verification.notes
     
     db.commit()
+    invalidate_member(member.username)
     
     return {"message": "Member verification updated"}
 
 @app.post("/token")
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    member = db.query(Member).filter(Member.username == form_data.username).first()
-    if not member or not verify_password(form_data.password, member.hashed_password):
+    result = await db.execute(select(Member).where(Member.username == form_data.username))
+    member = result.scalars().first()
+    if not member or not await verify_password_async(form_data.password, member.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password"
@@ -226,44 +539,133 @@ def login(
         "member_id": member.id
     }
 
+def _epoch(value: Optional[datetime]):
+    return value.timestamp() if value else None
+
+async def _open_election(db: AsyncSession, election_id: int) -> ElectionRecord:
+    election = await get_election(db, election_id)
+    if election is None:
+        raise HTTPException(status_code=404, detail="Election not found")
+    if not election.is_open():
+        raise HTTPException(status_code=409, detail="Election is not open for voting")
+    return election
+
+@app.post("/admin/elections")
+async def create_election(
+    election_data: ElectionInput,
+    current_user: MemberRecord = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    election = Election(
+        name=election_data.name,
+        candidates=election_data.candidates,
+        opens_at=_epoch(election_data.opens_at),
+        closes_at=_epoch(election_data.closes_at)
+    )
+    db.add(election)
+    await db.commit()
+    
+    return ElectionRecord(election).to_dict()
+
+@app.patch("/admin/elections/{election_id}")
+async def update_election_window(
+    election_id: int,
+    window: ElectionWindow,
+    current_user: MemberRecord = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    election = await db.get(Election, election_id)
+    if not election:
+        raise HTTPException(status_code=404, detail="Election not found")
+    # Only the bounds sent are changed (an explicit null clears one); the other keeps its stored value
+    changes = {field: _epoch(value) for field, value in window.dict(exclude_unset=True).items()}
+    opens_at = changes.get("opens_at", election.opens_at)
+    closes_at = changes.get("closes_at", election.closes_at)
+    if opens_at is not None and closes_at is not None and closes_at <= opens_at:
+        raise HTTPException(status_code=400, detail="closes_at must be after opens_at")
+    
+    for field, value in changes.items():
+        setattr(election, field, value)
+    await db.commit()
+    invalidate_election(election_id)
+    
+    return ElectionRecord(election).to_dict()
+
+@app.get("/elections")
+async def list_elections(db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(Election).order_by(Election.id))
+    return {"elections": [ElectionRecord(e).to_dict() for e in result.scalars().all()]}
+
+@app.get("/elections/{election_id}")
+async def get_election_details(election_id: int, db: AsyncSession = Depends(get_async_db)):
+    election = await get_election(db, election_id)
+    if election is None:
+        raise HTTPException(status_code=404, detail="Election not found")
+    
+    return election.to_dict()
+
 @app.post("/vote")
-def vote(
+async def vote(
     vote_data: VoteInput,
-    current_user: Member = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: MemberRecord = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    member = db.query(Member).filter(Member.username == current_user).first()
-    
-    if not member:
-        raise HTTPException(status_code=404, detail="Member not found")
-    if not member.is_verified:
+    if not current_user.is_verified:
         raise HTTPException(status_code=403, detail="Member not verified")
-    if member.has_voted:
-        raise HTTPException(status_code=400, detail="Already voted")
-    
-    # Record vote
-    blockchain.add_vote(
-        member_id=member.id,
-        member_name=member.full_name,
-        candidate=vote_data.candidate
-    )
+    if vote_data.election is None:
+        if current_user.has_voted:
+            raise HTTPException(status_code=400, detail="Already voted")
+    else:
+        election = await _open_election(db, vote_data.election)
+        if vote_data.candidate not in election.candidates:
+            raise HTTPException(status_code=400, detail="Unknown candidate for this election")
+    if sealer.is_overloaded():
+        raise HTTPException(
+            status_code=503,
+            detail="Vote queue is full, please retry shortly",
+            headers={"Retry-After": str(int(sealer.max_age) or 1)}
+        )
     
-    # Mark as voted
-    member.has_voted = True
-    db.commit()
+    # The ingestor marks has_voted atomically in a group commit, then adds the vote to the pending pool
+    try:
+        recorded = await ingestor.submit(
+            current_user.id, current_user.username, vote_data.candidate, vote_data.election
+        )
+    except AlreadyVoted:
+        raise HTTPException(status_code=400, detail="Already voted")
+    except IngestQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Vote queue is full, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
     
     return {
         "message": "Vote recorded successfully",
         "details": {
-            "candidate": vote_data.candidate,
-            "timestamp": time(),
+            "candidate": recorded['candidate'],
+            "election": vote_data.election,
+            "timestamp": recorded['timestamp'],
             "pending_confirmation": True
         }
     }
 
+@app.get("/vote/ingest-stats")
+def get_ingest_stats(current_user: MemberRecord = Depends(get_current_user)):
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return ingestor.stats()
+
 @app.get("/members/me")
 def get_profile(
-    current_user: Member = Depends(get_current_user),
+    current_user: MemberRecord = Depends(get_current_user),
     # db: Session = Depends(get_db)
 ):
     # member = db.query(Member).filter(Member.username == current_user).first()
@@ -280,36 +682,237 @@ def get_profile(
         "join_date": current_user.created_at
     }
 
+@app.get("/members/me/vote")
+def get_my_vote(election: Optional[int] = None, current_user: MemberRecord = Depends(get_current_user)):
+    # Answered from the chain's member index; no block is scanned
+    location = blockchain.lookup_vote(str(current_user.id), election)
+    if location is None:
+        raise HTTPException(status_code=404, detail="No vote found for this member")
+    if location == PENDING:
+        return {"status": "pending", "election": election}
+    
+    block_index, position = location
+    block = blockchain.chain[block_index - 1]
+    return {
+        "status": "sealed",
+        "election": election,
+        "block_index": block_index,
+        "position": position,
+        "block_hash": block['hash'],
+        "confirmations": len(blockchain.chain) - block_index,
+        "vote": block['votes'][position]
+    }
+
+@app.get("/members/me/vote-proof")
+def get_vote_proof(election: Optional[int] = None, current_user: MemberRecord = Depends(get_current_user)):
+    receipt = blockchain.vote_receipt(str(current_user.id), election)
+    if not receipt:
+        raise HTTPException(status_code=404, detail="No sealed vote found for this member")
+    
+    return receipt
+
 @app.post("/mine")
-def mine_block(current_user: Member = Depends(get_current_user), db: Session = Depends(get_db)):
+async def mine_block(
+    wait: bool = False,
+    current_user: MemberRecord = Depends(get_current_user)
+):
     if not is_admin(current_user):
         raise HTTPException(status_code=403, detail="Admin access required")
     
+    if not sealer.enabled:
+        raise HTTPException(status_code=409, detail="This node follows the chain; mine on the writer node")
     if not blockchain.current_votes:
         raise HTTPException(status_code=400, detail="No votes to mine")
     
-    previous_hash = blockchain.get_last_block()["hash"]
-    block = blockchain.create_block(previous_hash)
+    # Mining runs on the miner thread (and its worker processes), never on the event loop
+    job_id, future = sealer.submit()
+    if not wait:
+        return {"message": "Mining job submitted", "job_id": job_id}
     
-    return {
-        "message": "Block mined successfully",
-        "block_index": block['index'],
-        "votes_included": len(block['votes']),
-        "block_hash": block['hash']
-    }
+    block = await asyncio.wrap_future(future)
+    if block is None:
+        raise HTTPException(status_code=400, detail="No votes to mine")
+    
+    return {"message": "Block mined successfully", "job_id": job_id, **block}
+
+@app.get("/mine/{job_id}")
+def get_mining_job(job_id: str, current_user: MemberRecord = Depends(get_current_user)):
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    job = mining_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Mining job not found")
+    
+    return job
+
+@app.get("/admin/cache-stats")
+def get_cache_stats(current_user: MemberRecord = Depends(get_current_user)):
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return cache_stats()
+
+@app.get("/admin/password-pool")
+def get_password_pool_stats(current_user: MemberRecord = Depends(get_current_user)):
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return password_pool.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/node")
+def get_node():
+    if chain_sync is None:
+        return {"role": "standalone", "height": len(blockchain.chain), "pending_votes": len(blockchain.current_votes)}
+    return chain_sync.stats()
+
+@app.get("/results/live-stats")
+def get_live_stats():
+    return broadcaster.stats()
+
+@app.get("/scheduler/stats")
+def get_scheduler_stats():
+    return sealer.stats()
 
 @app.get("/chain")
-def get_chain():
-    return {
-        "chain_length": len(blockchain.chain),
-        "chain": blockchain.chain,
-        "pending_votes": len(blockchain.current_votes)
-    }
+def get_chain(
+    request: Request,
+    start: int = 1,
+    limit: Optional[int] = None,
+    headers_only: bool = False,
+    format: str = "json"
+):
+    if start < 1:
+        raise HTTPException(status_code=400, detail="start must be at least 1")
+    if limit is not None and not 1 <= limit <= CHAIN_PAGE_MAX_BLOCKS:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {CHAIN_PAGE_MAX_BLOCKS}")
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be json or ndjson")
+    
+    # Snapshot the chain so a block sealed mid-response can't change the page
+    chain = blockchain.chain[:]
+    pending = len(blockchain.current_votes)
+    etag = f'"{chain[-1]["hash"]}-{pending}"'
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    end = len(chain) if limit is None else min(len(chain), start - 1 + limit)
+    blocks = chain[start - 1:end]
+    headers = {"ETag": etag}
+    
+    if format == "ndjson":
+        def stream():
+            for block in blocks:
+                yield blockchain.serialize_block(block, headers_only) + b"\n"
+        return StreamingResponse(stream(), media_type="application/x-ndjson", headers=headers)
+    
+    body = b"".join([
+        b'{"chain_length":', str(len(chain)).encode(),
+        b',"pending_votes":', str(pending).encode(),
+        b',"next_start":', (str(end + 1).encode() if end < len(chain) else b"null"),
+        b',"chain":[', b",".join(blockchain.serialize_block(block, headers_only) for block in blocks), b"]}"
+    ])
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/chain/verify")
+def verify_chain(
+    full: bool = False,
+    check_votes: bool = False,
+    current_user: Optional[MemberRecord] = Depends(get_optional_user)
+):
+    # Incremental checks are cheap; a full or vote-level pass costs O(total votes), so only admins may ask
+    if (full or check_votes) and not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return blockchain.verify_chain(full=full, check_votes=check_votes)
 
 @app.get("/results")
-def get_results():
+async def get_results(election: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
+    if election is None:
+        return {
+            "vote_counts": blockchain.count_votes(),
+            "total_votes_cast": blockchain.total_votes,
+            "last_block_mined": blockchain.get_last_block()['index']
+        }
+    
+    record = await get_election(db, election)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Election not found")
+    # Read from the election's own running tally; other elections' votes are never touched
+    tally = blockchain.count_votes(election)
     return {
-        "vote_counts": blockchain.count_votes(),
-        "total_votes_cast": sum(blockchain.count_votes().values()),
+        "election": record.to_dict(),
+        "vote_counts": {candidate: tally.get(candidate, 0) for candidate in record.candidates},
+        "total_votes_cast": sum(tally.values()),
         "last_block_mined": blockchain.get_last_block()['index']
+    }
+
+async def _live_election_exists(election: Optional[int]) -> bool:
+    # A short-lived session: live connections must not hold a pooled connection open
+    if election is None:
+        return True
+    async with AsyncSessionLocal() as db:
+        return await get_election(db, election) is not None
+
+@app.get("/results/stream")
+async def stream_results(request: Request, election: Optional[int] = None):
+    if not await _live_election_exists(election):
+        raise HTTPException(status_code=404, detail="Election not found")
+    subscription = broadcaster.subscribe(election)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many live subscribers")
+    subscriber, snapshot = subscription
+    
+    async def events():
+        try:
+            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+            while not await request.is_disconnected():
+                delta = await subscriber.next(timeout=LIVE_KEEPALIVE_SECONDS)
+                yield f"event: delta\ndata: {json.dumps(delta)}\n\n" if delta else ": keepalive\n\n"
+        finally:
+            broadcaster.unsubscribe(subscriber)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.websocket("/results/ws")
+async def results_websocket(websocket: WebSocket, election: Optional[int] = None):
+    if not await _live_election_exists(election):
+        await websocket.close(code=1008)  # Unknown election
+        return
+    subscription = broadcaster.subscribe(election)
+    if subscription is None:
+        await websocket.close(code=1013)  # Try again later
+        return
+    subscriber, snapshot = subscription
+    await websocket.accept()
+    dropped = False
+    try:
+        await websocket.send_json(snapshot)
+        while True:
+            delta = await subscriber.next(timeout=LIVE_KEEPALIVE_SECONDS)
+            message = delta or {"type": "keepalive"}
+            try:
+                await asyncio.wait_for(websocket.send_json(message), LIVE_SEND_TIMEOUT)
+            except asyncio.TimeoutError:
+                # A consumer this slow is dropped rather than allowed to hold a connection open
+                dropped = True
+                await websocket.close(code=1008)
+                return
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broadcaster.unsubscribe(subscriber, dropped=dropped)
+
+@app.get("/results/verify")
+def verify_results(election: Optional[int] = None, current_user: MemberRecord = Depends(get_current_user)):
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return {
+        "consistent": blockchain.verify_tally(election),
+        "running_tally": blockchain.count_votes(election),
+        "recounted_tally": blockchain.recount_votes(election)
     }
\ No newline at end of file
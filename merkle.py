@@ -0,0 +1,58 @@
+import hashlib
+import json
+
+# ---------------------------
+# Merkle trees over block votes
+# ---------------------------
+#
+# Leaves and inner nodes use distinct prefixes so a leaf can never be passed
+# off as an inner node. An odd node at any level is paired with itself.
+
+EMPTY_ROOT = hashlib.sha256(b"").hexdigest()
+
+
+def leaf_hash(vote) -> bytes:
+    return hashlib.sha256(b"\x00" + json.dumps(vote, sort_keys=True).encode()).digest()
+
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _next_level(level):
+    if len(level) % 2:
+        level = level + [level[-1]]
+    return [_node_hash(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+
+
+def merkle_root(votes) -> str:
+    """Root hash (hex) over the votes in block order"""
+    if not votes:
+        return EMPTY_ROOT
+    level = [leaf_hash(vote) for vote in votes]
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0].hex()
+
+
+def merkle_path(votes, position):
+    """Sibling hashes from the leaf at `position` up to the root"""
+    level = [leaf_hash(vote) for vote in votes]
+    path = []
+    while len(level) > 1:
+        if len(level) % 2:
+            level = level + [level[-1]]
+        sibling = position ^ 1
+        path.append({"hash": level[sibling].hex(), "side": "left" if sibling < position else "right"})
+        level = _next_level(level)
+        position //= 2
+    return path
+
+
+def verify_path(vote, path, root) -> bool:
+    """Check that `vote` is included under `root` using its Merkle path"""
+    node = leaf_hash(vote)
+    for step in path:
+        sibling = bytes.fromhex(step["hash"])
+        node = _node_hash(sibling, node) if step["side"] == "left" else _node_hash(node, sibling)
+    return node.hex() == root
@@ -0,0 +1,136 @@
+import bisect
+import threading
+
+# ---------------------------
+# Minimal Prometheus text-format metrics
+# ---------------------------
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_string(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        if not self.labels and not self._values:
+            return [f"{self.name} 0"]
+        return [f"{self.name}{_label_string(self.labels, k)} {v}" for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, description, labels=(), function=None):
+        # A function gauge is read at scrape time instead of being set on the hot path
+        self.function = function
+        super().__init__(name, description, labels)
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, amount=1, *labels):
+        self.inc(-amount, *labels)
+
+    def render(self):
+        if self.function is not None:
+            return [f"{self.name} {self.function()}"]
+        return [f"{self.name}{_label_string(self.labels, k)} {v}" for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, description, labels=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, description, labels)
+
+    def observe(self, value, *labels):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0, 0.0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += 1
+            state[2] += value
+
+    def render(self):
+        lines = []
+        with self._lock:
+            items = [(k, list(v[0]), v[1], v[2]) for k, v in self._values.items()]
+        for labels, counts, count, total in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_label_string(self.labels + ('le',), labels + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_string(self.labels + ('le',), labels + ('+Inf',))} {count}")
+            lines.append(f"{self.name}_sum{_label_string(self.labels, labels)} {total}")
+            lines.append(f"{self.name}_count{_label_string(self.labels, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# ---------------------------
+# Application metrics
+# ---------------------------
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status"))
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+MINING_DURATION = Histogram("mining_duration_seconds", "Time spent sealing a block")
+MINING_HASH_RATE = Gauge("mining_hash_rate", "Hashes per second of the most recent proof-of-work search")
+DB_QUERY_DURATION = Histogram("db_query_duration_seconds", "Database statement execution time", ("operation",))
+BCRYPT_DURATION = Histogram("bcrypt_duration_seconds", "Password hash or verify time", ("operation",))
+PASSWORD_POOL_REJECTIONS = Counter("password_pool_rejections_total", "Logins and registrations turned away because the bcrypt pool was full")
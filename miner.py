@@ -0,0 +1,144 @@
+import hashlib
+import multiprocessing
+import queue
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from time import time
+
+from config import MINING_WORKERS, MINING_CHUNK_SIZE, MINING_PARALLEL_MIN_DIFFICULTY
+
+# ---------------------------
+# Proof-of-work search
+# ---------------------------
+
+# How often the parent checks that its mining workers are still alive
+RESULT_POLL_SECONDS = 0.5
+
+def _meets_difficulty(digest: bytes, difficulty: int) -> bool:
+    """Check that a raw digest starts with `difficulty` zero hex digits"""
+    full, half = divmod(difficulty, 2)
+    if digest[:full] != bytes(full):
+        return False
+    return not half or digest[full] < 0x10
+
+
+def _search(block_string: bytes, difficulty: int, start: int, stop: int):
+    """Scan nonces in [start, stop) and return (nonce, hash) or None"""
+    base = hashlib.sha256(block_string)
+    for nonce in range(start, stop):
+        attempt = base.copy()
+        attempt.update(str(nonce).encode())
+        digest = attempt.digest()
+        if _meets_difficulty(digest, difficulty):
+            return nonce, digest.hex()
+    return None
+
+
+def _worker(block_string, difficulty, shard, shards, chunk_size, found, results):
+    # Shard r of the nonce space is [(r * shards + shard) * chunk, ... + chunk)
+    round_ = 0
+    while not found.is_set():
+        start = (round_ * shards + shard) * chunk_size
+        result = _search(block_string, difficulty, start, start + chunk_size)
+        if result is not None:
+            found.set()
+            results.put(result)
+            return
+        round_ += 1
+
+
+def find_nonce(block_string: bytes, difficulty: int, workers: int = MINING_WORKERS,
+               parallel_min_difficulty: int = MINING_PARALLEL_MIN_DIFFICULTY):
+    """Find a nonce whose hash meets the difficulty, splitting the search across processes"""
+    if workers <= 1 or difficulty < parallel_min_difficulty:
+        # Process startup costs more than the search itself at low difficulty
+        nonce = 0
+        while True:
+            result = _search(block_string, difficulty, nonce, nonce + MINING_CHUNK_SIZE)
+            if result is not None:
+                return result
+            nonce += MINING_CHUNK_SIZE
+
+    ctx = multiprocessing.get_context("spawn")
+    found = ctx.Event()
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(
+            target=_worker,
+            args=(block_string, difficulty, shard, workers, MINING_CHUNK_SIZE, found, results),
+            daemon=True
+        )
+        for shard in range(workers)
+    ]
+    try:
+        for process in processes:
+            process.start()
+        while True:
+            try:
+                return results.get(timeout=RESULT_POLL_SECONDS)
+            except queue.Empty:
+                pass
+            # Workers that crashed (or never got past spawn) would otherwise leave us waiting forever
+            if not any(process.is_alive() for process in processes):
+                try:
+                    return results.get_nowait()
+                except queue.Empty:
+                    raise RuntimeError("All mining workers exited without finding a nonce")
+    finally:
+        found.set()
+        for process in processes:
+            if process.pid is None:
+                continue
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+
+# ---------------------------
+# Background mining jobs
+# ---------------------------
+
+class MiningJobs:
+    """Runs mining off the request path, one job at a time, and tracks job status"""
+
+    def __init__(self, max_jobs: int = 1000):
+        # A single thread serialises mining so blocks are always appended in order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="miner")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._max_jobs = max_jobs
+
+    def submit(self, fn, *args):
+        job_id = uuid.uuid4().hex
+        job = {"job_id": job_id, "status": "pending", "submitted_at": time(), "result": None, "error": None}
+        with self._lock:
+            self._jobs[job_id] = job
+            # Forget the oldest finished jobs so the registry stays bounded
+            while len(self._jobs) > self._max_jobs:
+                oldest = next(iter(self._jobs))
+                if self._jobs[oldest]["status"] in ("pending", "running"):
+                    break
+                del self._jobs[oldest]
+        future = self._executor.submit(self._run, job, fn, *args)
+        return job_id, future
+
+    def _run(self, job, fn, *args):
+        job["status"] = "running"
+        try:
+            job["result"] = fn(*args)
+            job["status"] = "done"
+        except Exception as e:
+            job["error"] = str(e)
+            job["status"] = "failed"
+            raise
+        finally:
+            job["finished_at"] = time()
+        return job["result"]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, Index, JSON, ForeignKey
 from sqlalchemy.sql import func
 from database import Base
 
@@ -13,4 +13,51 @@ class Member(Base):
     is_verified = Column(Boolean, default=False)
     has_voted = Column(Boolean, default=False)
     verification_notes = Column(String(255), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Backs keyset pagination of the admin member listing
+        Index("ix_members_created_at_id", "created_at", "id"),
+    )
+
+class Election(Base):
+    """A ballot with its own candidates and voting window (epoch seconds; None means unbounded)"""
+    __tablename__ = "elections"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    candidates = Column(JSON, nullable=False)
+    opens_at = Column(Float, nullable=True)
+    closes_at = Column(Float, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ElectionVoter(Base):
+    """Records that a member has voted in an election; the unique index rejects a second vote"""
+    __tablename__ = "election_voters"
+
+    id = Column(Integer, primary_key=True)
+    election_id = Column(Integer, ForeignKey("elections.id"), nullable=False)
+    member_id = Column(Integer, ForeignKey("members.id"), nullable=False)
+    voted_at = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ux_election_voters_election_member", "election_id", "member_id", unique=True),
+    )
+
+class PendingVote(Base):
+    """A committed vote waiting for the sealing process to pick it up (shared-chain mode)"""
+    __tablename__ = "pending_votes"
+
+    id = Column(Integer, primary_key=True)
+    member_id = Column(Integer, nullable=False)
+    # None for votes cast without an election
+    election_id = Column(Integer, nullable=True)
+    username = Column(String(50), nullable=False)
+    candidate = Column(String(255), nullable=False)
+    timestamp = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ux_pending_votes_election_member", "election_id", "member_id", unique=True),
+        # The sealer imports rows above a high-water id; SQLite must never reuse ids once the table drains
+        {"sqlite_autoincrement": True},
+    )
@@ -0,0 +1,121 @@
+import asyncio
+from collections import deque
+from time import time
+
+from config import (
+    SEAL_BATCH_SIZE, SEAL_MAX_AGE_SECONDS, SEAL_POLL_INTERVAL,
+    MAX_PENDING_VOTES, CONFIRMATION_SAMPLES
+)
+
+# ---------------------------
+# Automatic block sealing
+# ---------------------------
+
+class SealingScheduler:
+    """Seals a block when enough votes are pending or the oldest one gets too old"""
+
+    def __init__(self, blockchain, mining_jobs):
+        self.blockchain = blockchain
+        self.mining_jobs = mining_jobs
+        self.batch_size = SEAL_BATCH_SIZE
+        self.max_age = SEAL_MAX_AGE_SECONDS
+        self.max_pending = MAX_PENDING_VOTES
+        self.blocks_sealed = 0
+        # Only the chain writer seals; followers leave this off (see sync.ChainSync)
+        self.enabled = True
+        # Pending votes across every process, published by sync.ChainSync in shared mode
+        self.shared_depth = None
+        self._confirmations = deque(maxlen=CONFIRMATION_SAMPLES)
+        self._in_flight = None
+        self._task = None
+
+    # Sealing
+
+    def _seal(self):
+        block = self.blockchain.mine_pending_votes(max_votes=self.batch_size)
+        if block is None:
+            return None
+        sealed_at = time()
+        self._confirmations.extend(sealed_at - timestamp for timestamp in block['votes'].timestamps)
+        self.blocks_sealed += 1
+        return {
+            "block_index": block['index'],
+            "votes_included": len(block['votes']),
+            "block_hash": block['hash'],
+            "nonce": block['nonce']
+        }
+
+    def submit(self):
+        """Queue a sealing job on the miner and return (job_id, future)"""
+        return self.mining_jobs.submit(self._seal)
+
+    def is_due(self, now=None):
+        if not self.enabled:
+            return False
+        pending = len(self.blockchain.current_votes)
+        if not pending:
+            return False
+        if pending >= self.batch_size:
+            return True
+        oldest = self.blockchain.oldest_pending_timestamp()
+        return oldest is not None and (now or time()) - oldest >= self.max_age
+
+    def queue_depth(self):
+        """Votes waiting to be sealed; in shared mode, those committed by any process"""
+        if self.shared_depth is not None:
+            return self.shared_depth
+        return len(self.blockchain.current_votes)
+
+    def is_overloaded(self):
+        """True when ingestion has outrun sealing and new votes should back off"""
+        return self.queue_depth() >= self.max_pending
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(SEAL_POLL_INTERVAL)
+            # Only one scheduled block at a time; the next check happens once it lands
+            if self._in_flight is not None and not self._in_flight.done():
+                continue
+            if self.is_due():
+                _, self._in_flight = self.submit()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # Stats
+
+    def stats(self):
+        samples = sorted(self._confirmations)
+
+        def percentile(p):
+            if not samples:
+                return None
+            return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+        oldest = self.blockchain.oldest_pending_timestamp()
+        return {
+            "queue_depth": self.queue_depth(),
+            "oldest_pending_age": time() - oldest if oldest is not None else None,
+            "overloaded": self.is_overloaded(),
+            "blocks_sealed": self.blocks_sealed,
+            "batch_size": self.batch_size,
+            "max_age_seconds": self.max_age,
+            "time_to_confirmation": {
+                "samples": len(samples),
+                "mean": sum(samples) / len(samples) if samples else None,
+                "p50": percentile(50),
+                "p90": percentile(90),
+                "p99": percentile(99),
+                "max": samples[-1] if samples else None
+            }
+        }
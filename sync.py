@@ -0,0 +1,199 @@
+import asyncio
+import fcntl
+import logging
+import os
+import threading
+from time import sleep
+
+from sqlalchemy import delete, func, insert, select
+
+from blockchain import DuplicateVote
+from config import CHAIN_SYNC_INTERVAL
+from models import PendingVote
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Shared chain across workers and local nodes
+# ---------------------------
+#
+# Every process shares the SQLite database and the chain store directory. The
+# process holding an exclusive lock on the store is the single writer: it
+# imports committed votes from the pending_votes table, seals blocks and
+# appends them to the store. Every other process follows by tailing the
+# store's segment log, verifying and applying each new block. If the writer
+# dies its lock is released and the next follower to try takes over.
+
+def acquire_leadership(directory):
+    """Try to become the single writer; returns the held lock file, or None"""
+    os.makedirs(directory, exist_ok=True)
+    lock_file = open(os.path.join(directory, "writer.lock"), "a+")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def wait_for_genesis(store, interval=0.1):
+    """Block until the writer has stored at least the genesis block"""
+    while not store.refresh():
+        sleep(interval)
+
+
+class ChainSync:
+    def __init__(self, blockchain, store, sealer, session_factory, directory, lock_file=None):
+        self.blockchain = blockchain
+        self.store = store
+        self.sealer = sealer
+        self.session_factory = session_factory
+        self.directory = directory
+        self.lock_file = lock_file
+        # The writer only seals once its journaled votes are adopted on the first tick
+        self.sealer.enabled = False
+        self._adopted = False
+        self._imported = 0  # Highest pending_votes.id already in the pending pool
+        self._sealed = []
+        self._sealed_lock = threading.Lock()
+        self._task = None
+        blockchain.add_listener(self._on_block)
+
+    @property
+    def is_leader(self):
+        return self.lock_file is not None
+
+    @property
+    def role(self):
+        return "writer" if self.is_leader else "follower"
+
+    def _on_block(self, block):
+        # Runs on the miner thread; the sealed votes are dropped from the table on the next tick
+        if self.is_leader:
+            with self._sealed_lock:
+                votes = block['votes']
+                self._sealed.extend(zip(votes.election_ids, map(int, votes.member_ids)))
+
+    async def _promote(self):
+        logger.warning("taking over as chain writer", extra={"height": len(self.blockchain.chain)})
+        await asyncio.to_thread(self.store.close)
+        await asyncio.to_thread(self.store.open)
+        await asyncio.to_thread(self.blockchain.sync_from_store)
+        await self._adopt_journal()
+
+    async def _adopt_journal(self):
+        """Move journaled votes missing from pending_votes into it, then rebuild the pool from the table
+
+        A node that ran unshared before CHAIN_SHARED was turned on has committed
+        votes only in its local journal; dropping them would lose acknowledged votes.
+        """
+        journaled = list(self.blockchain.current_votes)
+        if journaled:
+            async with self.session_factory() as db:
+                result = await db.execute(select(PendingVote.election_id, PendingVote.member_id))
+                queued = {(election or 0, member_id) for election, member_id in result.all()}
+                missing = [
+                    {"member_id": int(vote['member_id']), "election_id": vote.get('election'),
+                     "username": vote['username'], "candidate": vote['candidate'], "timestamp": vote['timestamp']}
+                    for vote in journaled
+                    if (vote.get('election') or 0, int(vote['member_id'])) not in queued
+                ]
+                if missing:
+                    await db.execute(insert(PendingVote), missing)
+                    await db.commit()
+            if missing:
+                logger.warning("adopted journaled votes into pending_votes", extra={"votes": len(missing)})
+        # Committed votes now all live in pending_votes; the local journal would duplicate them
+        self.blockchain.replace_pending([])
+        self._imported = 0
+        self._adopted = True
+        self.sealer.enabled = True
+
+    async def _import_pending(self):
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(PendingVote).where(PendingVote.id > self._imported).order_by(PendingVote.id)
+            )
+            rows = result.scalars().all()
+        if not rows:
+            return
+        for row in rows:
+            try:
+                self.blockchain.add_vote(
+                    str(row.member_id), row.username, row.candidate,
+                    timestamp=row.timestamp, election=row.election_id
+                )
+            except DuplicateVote:
+                # Sealed just before a writer crash, so its row was never deleted
+                with self._sealed_lock:
+                    self._sealed.append((row.election_id or 0, row.member_id))
+        self._imported = rows[-1].id
+
+    async def _delete_sealed(self):
+        with self._sealed_lock:
+            sealed, self._sealed = self._sealed, []
+        if not sealed:
+            return
+        by_election = {}
+        for election, member_id in sealed:
+            by_election.setdefault(election, []).append(member_id)
+        async with self.session_factory() as db:
+            for election, member_ids in by_election.items():
+                # Election 0 marks untagged votes, stored with a NULL election_id
+                column = PendingVote.election_id
+                await db.execute(delete(PendingVote).where(
+                    column == election if election else column.is_(None),
+                    PendingVote.member_id.in_(member_ids)
+                ))
+            await db.commit()
+
+    async def _publish_depth(self):
+        # Followers never hold the pending pool, so every process reads backpressure from the table
+        async with self.session_factory() as db:
+            result = await db.execute(select(func.count()).select_from(PendingVote))
+            self.sealer.shared_depth = result.scalar()
+
+    async def _tick(self):
+        if self.is_leader:
+            if not self._adopted:
+                await self._adopt_journal()
+            await self._import_pending()
+            await self._delete_sealed()
+        else:
+            self.lock_file = acquire_leadership(self.directory)
+            if self.is_leader:
+                await self._promote()
+            else:
+                await asyncio.to_thread(self.blockchain.sync_from_store)
+        await self._publish_depth()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(CHAIN_SYNC_INTERVAL)
+            try:
+                await self._tick()
+            except Exception:
+                logger.exception("chain sync failed")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader:
+            await self._delete_sealed()
+
+    def stats(self):
+        return {
+            "role": self.role,
+            "height": len(self.blockchain.chain),
+            "pending_votes": self.sealer.queue_depth(),
+            "last_imported_pending_id": self._imported if self.is_leader else None
+        }
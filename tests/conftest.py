@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# The app modules are flat top-level modules that read their settings at import
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_workdir = tempfile.mkdtemp(prefix="voting-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'members.db')}")
+os.environ.setdefault("CHAIN_DATA_DIR", os.path.join(_workdir, "chain"))
+os.environ.setdefault("POA_KEY_FILE", os.path.join(_workdir, "poa.key"))
@@ -0,0 +1,75 @@
+import pytest
+
+from blockchain import Blockchain
+from consensus import ProofOfAuthority
+from merkle import merkle_root
+
+
+def test_election_votes_stay_out_of_the_untagged_tally():
+    chain = Blockchain()
+    chain.difficulty = 1
+    for member_id in range(4):
+        chain.add_vote(str(member_id), f"user{member_id}", "board-a", election=1)
+    chain.add_vote("0", "user0", "yes")
+    block = chain.mine_pending_votes()
+
+    assert chain.count_votes() == {"yes": 1}
+    assert chain.total_votes == 1
+    assert chain.count_votes(1) == {"board-a": 4}
+    assert block['votes'].candidate_counts() == {"yes": 1}
+    assert chain.recount_votes() == {"yes": 1}
+    assert chain.verify_tally() and chain.verify_tally(1)
+
+
+def _forge(chain, consensus, difficulty=None):
+    """A block on top of `chain` that claims `consensus` (and difficulty), sealed as cheaply as that allows"""
+    tip = chain.get_last_block()
+    block = {
+        'index': tip['index'] + 1, 'timestamp': tip['timestamp'] + 1, 'votes': [],
+        'merkle_root': merkle_root([]), 'vote_count': 0, 'consensus': consensus,
+        'previous_hash': tip['hash'],
+    }
+    if difficulty is not None:
+        block['difficulty'] = difficulty
+    if consensus == "pow":
+        block['nonce'] = 0
+        block['hash'] = chain.hash_block(block)
+    else:
+        block['hash'] = chain.consensus_types[consensus].seal(chain, block)
+    return block
+
+
+def test_forged_blocks_are_rejected():
+    chain = Blockchain(difficulty=2)
+    assert not chain.is_valid_proof(_forge(chain, "pow", difficulty=0))
+    assert not chain.is_valid_proof(_forge(chain, "pow", difficulty=-1))
+    # A consensus the node is not configured for is not accepted either
+    assert not chain.is_valid_proof(_forge(chain, "poa"))
+    assert not chain.is_valid_proof({**_forge(chain, "pow", difficulty=0), 'consensus': "scrypt"})
+
+    chain.chain.append(_forge(chain, "pow", difficulty=0))
+    result = chain.verify_chain(full=True)
+    assert not result["valid"] and result["verified_height"] == 1
+
+
+def test_legacy_consensus_must_be_allowed_explicitly():
+    chain = Blockchain(consensus="pow", legacy_consensus=["poa"], difficulty=2)
+    assert chain.is_valid_proof(_forge(chain, "poa"))
+
+    poa_chain = Blockchain(consensus="poa")
+    assert not poa_chain.is_valid_proof(_forge(poa_chain, "pow", difficulty=0))
+
+
+def test_poa_verify_does_not_create_a_missing_key(tmp_path):
+    key_file = tmp_path / "poa.key"
+    sealer = ProofOfAuthority(str(key_file))
+    chain = Blockchain(difficulty=2)
+    block = _forge(chain, "pow", difficulty=2)
+    block['consensus'] = "poa"
+
+    with pytest.raises(RuntimeError):
+        sealer.verify(chain, block)
+    assert not key_file.exists()
+
+    block['hash'] = sealer.seal(chain, block)
+    assert key_file.exists() and sealer.verify(chain, block)
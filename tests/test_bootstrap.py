@@ -0,0 +1,38 @@
+from sqlalchemy import create_engine, inspect
+
+from bootstrap import migrate
+
+# pending_votes as first created for the shared chain: one vote per member, no elections
+OLD_PENDING_VOTES = """
+CREATE TABLE pending_votes (
+    id INTEGER NOT NULL PRIMARY KEY,
+    member_id INTEGER NOT NULL,
+    username VARCHAR(50) NOT NULL,
+    candidate VARCHAR(255) NOT NULL,
+    timestamp FLOAT NOT NULL,
+    UNIQUE (member_id)
+)
+"""
+
+
+def test_migrate_upgrades_an_old_pending_votes_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'members.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(OLD_PENDING_VOTES)
+        conn.exec_driver_sql(
+            "INSERT INTO pending_votes (id, member_id, username, candidate, timestamp) VALUES (7, 1, 'u', 'a', 1.0)"
+        )
+
+    migrate(engine)
+
+    inspector = inspect(engine)
+    assert "election_id" in {c["name"] for c in inspector.get_columns("pending_votes")}
+    assert "ux_pending_votes_election_member" in {i["name"] for i in inspector.get_indexes("pending_votes")}
+    with engine.begin() as conn:
+        assert conn.exec_driver_sql("SELECT id, member_id, election_id FROM pending_votes").all() == [(7, 1, None)]
+        # The same member may now have a pending vote in an election too
+        conn.exec_driver_sql(
+            "INSERT INTO pending_votes (member_id, election_id, username, candidate, timestamp) VALUES (1, 2, 'u', 'b', 2.0)"
+        )
+    assert migrate(engine) == 0
+    engine.dispose()
@@ -0,0 +1,107 @@
+import json
+import os
+
+import pytest
+
+from blockchain import Blockchain
+from chainstore import ChainStore
+
+
+def _seal_blocks(chain, blocks, votes_per_block=3):
+    for b in range(len(chain.chain), len(chain.chain) + blocks):
+        for v in range(votes_per_block):
+            chain.add_vote(f"{b}-{v}", f"user{b}-{v}", "alice" if v % 2 else "bob")
+        chain.mine_pending_votes()
+
+
+def _open_chain(directory, checkpoint_interval=100):
+    store = ChainStore(directory, checkpoint_interval=checkpoint_interval).open()
+    chain = Blockchain(store=store, difficulty=1)
+    return store, chain
+
+
+def test_torn_tail_is_truncated_on_open(tmp_path):
+    directory = str(tmp_path)
+    store, chain = _open_chain(directory)
+    _seal_blocks(chain, 2)
+    store.close()
+
+    segment = os.path.join(directory, "segment-000001.log")
+    intact = os.path.getsize(segment)
+    with open(segment, "ab") as f:
+        f.write(b'{"index": 4, "votes": [')  # a crash mid-append
+
+    store, chain = _open_chain(directory)
+    assert store.height() == 3
+    assert os.path.getsize(segment) == intact
+    _seal_blocks(chain, 1)
+    assert store.read_block(4)['hash'] == chain.chain[-1]['hash']
+    store.close()
+
+
+def test_restart_replays_blocks_after_the_checkpoint(tmp_path):
+    directory = str(tmp_path)
+    store, chain = _open_chain(directory, checkpoint_interval=2)
+    _seal_blocks(chain, 4)
+    tally, total = chain.count_votes(), chain.total_votes
+    store.close()
+
+    with open(os.path.join(directory, "checkpoint.json")) as f:
+        assert json.load(f)["height"] == 4
+    store, restored = _open_chain(directory, checkpoint_interval=2)
+    assert len(restored.chain) == 5
+    assert restored.count_votes() == tally and restored.total_votes == total
+    assert restored.verify_tally()
+    store.close()
+
+
+def test_tampered_block_after_the_checkpoint_fails_restore(tmp_path):
+    directory = str(tmp_path)
+    store, chain = _open_chain(directory, checkpoint_interval=3)
+    _seal_blocks(chain, 3)
+    store.close()
+
+    segment = os.path.join(directory, "segment-000001.log")
+    with open(segment, "rb") as f:
+        lines = f.readlines()
+    block = json.loads(lines[-1])
+    block['timestamp'] += 1
+    lines[-1] = json.dumps(block).encode() + b"\n"
+    with open(segment, "wb") as f:
+        f.writelines(lines)
+    os.remove(os.path.join(directory, "index.bin"))
+
+    with pytest.raises(ValueError):
+        _open_chain(directory, checkpoint_interval=3)
+
+
+def test_flushed_pending_votes_are_on_disk(tmp_path):
+    directory = str(tmp_path)
+    store, chain = _open_chain(directory)
+    chain.add_vote("1", "user1", "alice")
+    chain.add_vote("2", "user2", "bob")
+    chain.flush_pending().result(timeout=5)
+
+    with open(os.path.join(directory, "pending.log")) as f:
+        assert [json.loads(line)['member_id'] for line in f] == ["1", "2"]
+    store.close()
+
+
+def test_tampered_block_below_the_checkpoint_fails_restore(tmp_path):
+    directory = str(tmp_path)
+    store, chain = _open_chain(directory, checkpoint_interval=3)
+    _seal_blocks(chain, 3)
+    store.close()
+
+    segment = os.path.join(directory, "segment-000001.log")
+    with open(segment, "rb") as f:
+        lines = f.readlines()
+    block = json.loads(lines[1])
+    block['timestamp'] += 1
+    lines[1] = json.dumps(block).encode() + b"\n"
+    with open(segment, "wb") as f:
+        f.writelines(lines)
+    os.remove(os.path.join(directory, "index.bin"))
+
+    with pytest.raises(ValueError):
+        _open_chain(directory, checkpoint_interval=3)
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from blockchain import Blockchain
+from chainstore import ChainStore
+from ingest import AlreadyVoted, VoteIngestor
+from models import Base, Election, ElectionVoter, Member
+
+
+async def _setup(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'members.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as db:
+        await db.execute(insert(Member), [
+            {"id": i, "full_name": f"Member {i}", "username": f"user{i}", "is_verified": True}
+            for i in (1, 2)
+        ])
+        await db.execute(insert(Election), [{"id": 1, "name": "Board", "candidates": ["alice", "bob"]}])
+        await db.commit()
+    return engine, session_factory
+
+
+def _outcomes(results):
+    accepted = [r for r in results if isinstance(r, dict)]
+    rejected = [r for r in results if isinstance(r, AlreadyVoted)]
+    assert len(accepted) + len(rejected) == len(results), results
+    return accepted, rejected
+
+
+@pytest.mark.parametrize("election", [None, 1])
+def test_concurrent_double_votes_are_accepted_once(tmp_path, election):
+    async def scenario():
+        engine, session_factory = await _setup(tmp_path)
+        store = ChainStore(str(tmp_path / "chain")).open()
+        blockchain = Blockchain(store=store)
+        ingestor = VoteIngestor(blockchain, session_factory)
+        ingestor.start()
+        try:
+            # Both members' duplicates land in the same group commit
+            results = await asyncio.gather(*(
+                ingestor.submit(member_id, f"user{member_id}", "alice", election)
+                for member_id in (1, 2, 1, 2, 1)
+            ), return_exceptions=True)
+            accepted, rejected = _outcomes(results)
+            assert sorted(vote['member_id'] for vote in accepted) == ["1", "2"]
+            assert len(rejected) == 3
+
+            # A retry in a later group is rejected too
+            with pytest.raises(AlreadyVoted):
+                await ingestor.submit(1, "user1", "bob", election)
+
+            assert len(blockchain.current_votes) == 2
+            async with session_factory() as db:
+                if election is None:
+                    voted = select(func.count()).select_from(Member).where(Member.has_voted == True)  # noqa: E712
+                else:
+                    voted = select(func.count()).select_from(ElectionVoter).where(ElectionVoter.election_id == election)
+                assert (await db.execute(voted)).scalar() == 2
+        finally:
+            await ingestor.stop()
+            store.close()
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_election_vote_does_not_use_up_the_untagged_ballot(tmp_path):
+    async def scenario():
+        engine, session_factory = await _setup(tmp_path)
+        blockchain = Blockchain()
+        ingestor = VoteIngestor(blockchain, session_factory)
+        ingestor.start()
+        try:
+            results = await asyncio.gather(
+                ingestor.submit(1, "user1", "alice", 1),
+                ingestor.submit(1, "user1", "bob", None),
+                ingestor.submit(1, "user1", "bob", 1),
+                return_exceptions=True
+            )
+            assert isinstance(results[0], dict) and isinstance(results[1], dict)
+            assert isinstance(results[2], AlreadyVoted)
+        finally:
+            await ingestor.stop()
+            await engine.dispose()
+
+    asyncio.run(scenario())
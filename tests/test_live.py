@@ -0,0 +1,37 @@
+import asyncio
+
+from blockchain import Blockchain
+from live import ResultsBroadcaster
+
+
+def test_subscribers_only_receive_their_own_election():
+    async def scenario():
+        chain = Blockchain(difficulty=1)
+        chain.add_vote("1", "user1", "yes")
+        chain.mine_pending_votes()
+        broadcaster = ResultsBroadcaster(chain)
+        broadcaster.start()
+
+        ballot, ballot_snapshot = broadcaster.subscribe()
+        board, board_snapshot = broadcaster.subscribe(election=7)
+        other, _ = broadcaster.subscribe(election=8)
+        assert ballot_snapshot["vote_counts"] == {"yes": 1}
+        assert board_snapshot["vote_counts"] == {} and board_snapshot["election"] == 7
+
+        chain.add_vote("1", "user1", "alice", election=7)
+        chain.add_vote("2", "user2", "alice", election=7)
+        chain.add_vote("2", "user2", "no")
+        await asyncio.to_thread(chain.mine_pending_votes)
+
+        delta = await board.next(timeout=1)
+        assert delta["increments"] == {"alice": 2} and delta["total_votes_cast"] == 2
+        assert delta["election"] == 7
+        delta = await ballot.next(timeout=1)
+        assert delta["increments"] == {"no": 1} and delta["total_votes_cast"] == 2
+        assert await other.next(timeout=0.05) is None
+
+        # A late subscriber's snapshot includes what was already published
+        _, snapshot = broadcaster.subscribe(election=7)
+        assert snapshot["vote_counts"] == {"alice": 2}
+
+    asyncio.run(scenario())
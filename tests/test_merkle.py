@@ -0,0 +1,29 @@
+import pytest
+
+from merkle import EMPTY_ROOT, merkle_path, merkle_root, verify_path
+
+
+def _votes(count):
+    return [{"member_id": str(i), "candidate": "alice" if i % 2 else "bob"} for i in range(count)]
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5, 6, 7, 9])
+def test_every_leaf_verifies_under_the_root(count):
+    votes = _votes(count)
+    root = merkle_root(votes)
+    for position, vote in enumerate(votes):
+        assert verify_path(vote, merkle_path(votes, position), root)
+
+
+@pytest.mark.parametrize("count", [3, 5, 7])
+def test_path_does_not_verify_another_vote(count):
+    votes = _votes(count)
+    root = merkle_root(votes)
+    last = count - 1
+    path = merkle_path(votes, last)
+    assert not verify_path(votes[last - 1], path, root)
+    assert not verify_path({**votes[last], "candidate": "mallory"}, path, root)
+
+
+def test_empty_block_root():
+    assert merkle_root([]) == EMPTY_ROOT
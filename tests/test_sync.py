@@ -0,0 +1,144 @@
+import asyncio
+from time import time
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from blockchain import Blockchain, PENDING
+from chainstore import ChainStore
+from miner import MiningJobs
+from models import Base, PendingVote
+from scheduler import SealingScheduler
+from sync import ChainSync, acquire_leadership
+
+
+async def _vote(session_factory, member_id):
+    async with session_factory() as db:
+        await db.execute(insert(PendingVote), [{
+            "member_id": member_id, "election_id": None, "username": f"user{member_id}",
+            "candidate": "alice", "timestamp": time()
+        }])
+        await db.commit()
+
+
+async def _pending_rows(session_factory):
+    async with session_factory() as db:
+        return (await db.execute(select(func.count()).select_from(PendingVote))).scalar()
+
+
+def test_votes_committed_after_the_table_drains_are_still_sealed(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'members.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        directory = str(tmp_path / "chain")
+        lock_file = acquire_leadership(directory)
+        store = ChainStore(directory).open()
+        blockchain = Blockchain(store=store)
+        blockchain.difficulty = 1
+        mining_jobs = MiningJobs()
+        sync = ChainSync(blockchain, store, SealingScheduler(blockchain, mining_jobs), session_factory, directory, lock_file)
+        try:
+            for member_id in range(1, 6):
+                await _vote(session_factory, member_id)
+            await sync._tick()
+            assert len(blockchain.current_votes) == 5
+
+            # Seal everything, then let the writer drain the table
+            blockchain.mine_pending_votes()
+            await sync._tick()
+            assert await _pending_rows(session_factory) == 0
+
+            # SQLite would hand out id 1 again here without AUTOINCREMENT
+            await _vote(session_factory, 6)
+            await sync._tick()
+            assert blockchain.lookup_vote("6") == PENDING
+
+            blockchain.mine_pending_votes()
+            assert blockchain.lookup_vote("6") == (3, 0)
+        finally:
+            mining_jobs.shutdown()
+            store.close()
+            lock_file.close()
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_votes_journaled_before_sharing_are_adopted(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'members.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        directory = str(tmp_path / "chain")
+
+        # An unshared node acknowledged these votes; they live only in its journal
+        store = ChainStore(directory).open()
+        blockchain = Blockchain(store=store, difficulty=1)
+        for member_id in range(1, 4):
+            blockchain.add_vote(str(member_id), f"user{member_id}", "alice")
+        store.close()
+        await _vote(session_factory, 3)  # already queued by a shared worker
+
+        lock_file = acquire_leadership(directory)
+        store = ChainStore(directory).open()
+        blockchain = Blockchain(store=store, difficulty=1)
+        mining_jobs = MiningJobs()
+        sealer = SealingScheduler(blockchain, mining_jobs)
+        sync = ChainSync(blockchain, store, sealer, session_factory, directory, lock_file)
+        try:
+            assert not sealer.enabled
+            await sync._tick()
+            assert sealer.enabled
+            assert await _pending_rows(session_factory) == 3
+            assert sorted(vote['member_id'] for vote in blockchain.current_votes) == ["1", "2", "3"]
+            assert sealer.queue_depth() == 3
+
+            blockchain.mine_pending_votes()
+            await sync._tick()
+            assert await _pending_rows(session_factory) == 0
+            assert sealer.queue_depth() == 0
+        finally:
+            mining_jobs.shutdown()
+            store.close()
+            lock_file.close()
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_followers_see_the_shared_queue_depth(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'members.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        directory = str(tmp_path / "chain")
+
+        lock_file = acquire_leadership(directory)
+        writer_store = ChainStore(directory).open()
+        Blockchain(store=writer_store, difficulty=1)
+        store = ChainStore(directory).open(readonly=True)
+        blockchain = Blockchain(store=store, difficulty=1)
+        mining_jobs = MiningJobs()
+        sealer = SealingScheduler(blockchain, mining_jobs)
+        sealer.max_pending = 3
+        sync = ChainSync(blockchain, store, sealer, session_factory, directory)
+        try:
+            for member_id in range(1, 4):
+                await _vote(session_factory, member_id)
+            await sync._tick()
+            assert not sync.is_leader
+            assert blockchain.current_votes == []
+            assert sealer.queue_depth() == 3 and sealer.is_overloaded()
+        finally:
+            mining_jobs.shutdown()
+            store.close()
+            writer_store.close()
+            lock_file.close()
+            await engine.dispose()
+
+    asyncio.run(scenario())
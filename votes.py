@@ -0,0 +1,113 @@
+import threading
+from array import array
+
+# ---------------------------
+# Compact storage for sealed votes
+# ---------------------------
+
+class CandidateRegistry:
+    """Interns candidate names to small integer ids"""
+
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+        self._lock = threading.Lock()
+
+    def intern(self, name: str) -> int:
+        candidate_id = self._ids.get(name)
+        if candidate_id is None:
+            with self._lock:
+                candidate_id = self._ids.get(name)
+                if candidate_id is None:
+                    candidate_id = len(self._names)
+                    self._names.append(name)
+                    self._ids[name] = candidate_id
+        return candidate_id
+
+    def name(self, candidate_id: int) -> str:
+        return self._names[candidate_id]
+
+    def __len__(self):
+        return len(self._names)
+
+
+class VoteColumns:
+    """The votes of one sealed block stored column-wise
+
+    Behaves as a read-only sequence of vote dicts, rebuilding each dict on
+    access, so hashing and API output see exactly the original votes.
+    """
+    __slots__ = ("registry", "member_ids", "usernames", "candidate_ids", "timestamps", "election_ids")
+
+    def __init__(self, registry: CandidateRegistry):
+        self.registry = registry
+        self.member_ids = []
+        self.usernames = []
+        self.candidate_ids = array("I")
+        self.timestamps = array("d")
+        # 0 marks a vote cast without an election (the original single ballot)
+        self.election_ids = array("I")
+
+    @classmethod
+    def from_dicts(cls, votes, registry: CandidateRegistry):
+        columns = cls(registry)
+        for vote in votes:
+            columns.member_ids.append(vote['member_id'])
+            columns.usernames.append(vote['username'])
+            columns.candidate_ids.append(registry.intern(vote['candidate']))
+            columns.timestamps.append(vote['timestamp'])
+            columns.election_ids.append(vote.get('election') or 0)
+        return columns
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        vote = {
+            'member_id': self.member_ids[position],
+            'username': self.usernames[position],
+            'candidate': self.registry.name(self.candidate_ids[position]),
+            'timestamp': self.timestamps[position]
+        }
+        if self.election_ids[position]:
+            vote['election'] = self.election_ids[position]
+        return vote
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def candidate_counts(self):
+        """Per-candidate counts of the votes cast without an election, without materialising any dicts"""
+        counts = {}
+        for election_id, candidate_id in zip(self.election_ids, self.candidate_ids):
+            if not election_id:
+                counts[candidate_id] = counts.get(candidate_id, 0) + 1
+        return {self.registry.name(candidate_id): n for candidate_id, n in counts.items()}
+
+    def election_counts(self):
+        """Per-election, per-candidate counts of the tagged votes in this block"""
+        counts = {}
+        for election_id, candidate_id in zip(self.election_ids, self.candidate_ids):
+            if election_id:
+                tally = counts.setdefault(election_id, {})
+                tally[candidate_id] = tally.get(candidate_id, 0) + 1
+        return {
+            election_id: {self.registry.name(candidate_id): n for candidate_id, n in tally.items()}
+            for election_id, tally in counts.items()
+        }
+
+    def to_list(self):
+        return list(self)
+
+
+def encode_votes(value):
+    """json.dumps `default` hook that serializes VoteColumns as a list of vote dicts"""
+    if isinstance(value, VoteColumns):
+        return value.to_list()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")